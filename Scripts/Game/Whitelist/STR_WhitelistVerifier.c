@@ -27,6 +27,8 @@ class STR_WL_CB : RestCallback
 		pm.KickPlayer(m_PlayerId, PlayerManagerKickReason.KICK, 0);
 	}
 
+	// HTTP-ошибки (в том числе 429 от лимита API) игрока не кикают, поэтому
+	// IP сервера должен быть в API_RATE_LIMIT_EXEMPT на стороне API.
 	override void OnError(int errorCode)
 	{
 		PrintFormat("[STR][WL] HTTP error %1 for pid=%2", errorCode, m_PlayerId);
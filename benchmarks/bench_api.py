@@ -0,0 +1,176 @@
+"""Нагрузка на Flask API конкурентными клиентами.
+
+Пример:
+    python -m benchmarks.bench_api --rows 100000 --clients 1 --clients 16 --output bench_api.json
+
+С --index API отвечает из mmap‑индекса (WHITELIST_INDEX_PATH) вместо SQLite,
+с --embedded замеряется встроенный в бота aiohttp‑сервер (EMBEDDED_API).
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from benchmarks.common import summarize, write_results
+from benchmarks.synthetic import Dataset, build_dataset
+from src.db import Database
+from src.embedded_api import EmbeddedApi
+from src.whitelist_index import export_whitelist_index
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def _urls(base: str, ds: Dataset, total: int, seed: int) -> List[str]:
+    """Смешанный поток запросов по обоим эндпоинтам (с промахами)."""
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(total):
+        if rng.random() < 0.5:
+            urls.append(f"{base}/api/whitelist/armaId/{rng.choice(ds.arma_ids)}")
+        else:
+            urls.append(f"{base}/api/whitelist/steamId/{rng.choice(ds.steam_ids)}")
+    return urls
+
+
+def drive(base: str, ds: Dataset, clients: int, total: int, seed: int) -> Dict[str, object]:
+    """Запускает clients потоков, каждый со своей HTTP‑сессией."""
+    urls = _urls(base, ds, total, seed)
+    local = threading.local()
+    errors = 0
+    lock = threading.Lock()
+
+    def one(url: str) -> float:
+        nonlocal errors
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        t0 = time.perf_counter()
+        r = session.get(url, timeout=30)
+        elapsed = time.perf_counter() - t0
+        if r.status_code != 200:
+            with lock:
+                errors += 1
+        return elapsed
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        samples = list(pool.map(one, urls))
+    wall = time.perf_counter() - t0
+    return {
+        "clients": clients,
+        "requests": total,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(total / wall, 1) if wall else None,
+        "latency": summarize(samples),
+    }
+
+
+async def _export(db_path: str, index_path: str) -> None:
+    db = Database(db_path)
+    await db.connect()
+    try:
+        await export_whitelist_index(db, index_path)
+    finally:
+        await db.close()
+
+
+class _EmbeddedServer:
+    """EmbeddedApi в отдельном потоке со своим event loop, как в процессе бота."""
+
+    def __init__(self, db_path: str, port: int = 0):
+        self.db_path = db_path
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.port = port
+        self.db: Database = None
+        self.api: EmbeddedApi = None
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _start(self) -> None:
+        self.db = Database(self.db_path)
+        await self.db.connect()
+        self.api = EmbeddedApi(self.db, host="127.0.0.1", port=self.port, audit=False)
+        await self.api.start()
+        self.port = self.api._runner.addresses[0][1]
+
+    async def _stop(self) -> None:
+        await self.api.stop()
+        await self.db.close()
+
+    def start(self) -> str:
+        self.thread.start()
+        with contextlib.redirect_stdout(sys.stderr):
+            self._call(self._start())
+        return f"http://127.0.0.1:{self.port}"
+
+    def stop(self) -> None:
+        self._call(self._stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="размер таблицы applications")
+    parser.add_argument("--clients", type=int, action="append", help="число конкурентных клиентов (можно несколько раз)")
+    parser.add_argument("--requests", type=int, default=2000, help="запросов на каждый уровень конкурентности")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--index", action="store_true", help="отвечать из файла индекса whitelist")
+    parser.add_argument("--embedded", action="store_true", help="замерить встроенный API бота вместо Flask")
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+    levels = args.clients or [1, 8, 32]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_api.db")
+        ds = build_dataset(path, args.rows, seed=args.seed)
+        os.environ["DATABASE_PATH"] = path
+        # Все клиенты идут с 127.0.0.1 — лимит на клиента здесь только мешает замеру.
+        os.environ.setdefault("API_RATE_LIMIT", "0")
+        if args.index:
+            index_path = os.path.join(tmp, "whitelist.idx")
+            asyncio.run(_export(path, index_path))
+            os.environ["WHITELIST_INDEX_PATH"] = index_path
+
+        if args.embedded:
+            embedded = _EmbeddedServer(path)
+            base = embedded.start()
+            stop = embedded.stop
+        else:
+            from src.api import app
+
+            server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=_QuietHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base = f"http://127.0.0.1:{server.server_port}"
+            stop = server.shutdown
+        try:
+            results = {str(c): drive(base, ds, c, args.requests, args.seed) for c in levels}
+        finally:
+            stop()
+
+    write_results(
+        "api",
+        {"rows": args.rows, "clients": levels, "requests": args.requests, "seed": args.seed,
+         "index": args.index, "embedded": args.embedded},
+        results,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Замеры латентности методов Database на синтетических данных.
+
+Пример:
+    python -m benchmarks.bench_db --rows 10000 --rows 100000 --output bench_db.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.common import summarize, write_results
+from benchmarks.synthetic import NOTIFICATION_PAYLOAD, Dataset, build_dataset, generate_join_attempts, seed_side_tables
+from src.db import Database
+
+Case = Callable[[Database, Dataset, random.Random], Awaitable[object]]
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str):
+    """Регистрирует сценарий замера под именем метода Database."""
+    def wrap(fn: Case) -> Case:
+        CASES[name] = fn
+        return fn
+    return wrap
+
+
+@case("get_application")
+async def _get_application(db, ds, rng):
+    return await db.get_application(rng.choice(ds.app_ids))
+
+
+@case("get_user_latest_application")
+async def _get_user_latest_application(db, ds, rng):
+    return await db.get_user_latest_application(rng.choice(ds.user_ids))
+
+
+@case("get_user_latest_archived_application")
+async def _get_user_latest_archived_application(db, ds, rng):
+    return await db.get_user_latest_archived_application(rng.choice(ds.user_ids))
+
+
+@case("get_steam_id_by_arma_id")
+async def _get_steam_id_by_arma_id(db, ds, rng):
+    return await db.get_steam_id_by_arma_id(rng.choice(ds.arma_ids))
+
+
+@case("is_whitelisted_by_arma_id")
+async def _is_whitelisted_by_arma_id(db, ds, rng):
+    return await db.is_whitelisted_by_arma_id(rng.choice(ds.arma_ids))
+
+
+@case("get_arma_id_by_steam_id")
+async def _get_arma_id_by_steam_id(db, ds, rng):
+    return await db.get_arma_id_by_steam_id(rng.choice(ds.steam_ids))
+
+
+@case("is_whitelisted_by_steam_id")
+async def _is_whitelisted_by_steam_id(db, ds, rng):
+    return await db.is_whitelisted_by_steam_id(rng.choice(ds.steam_ids))
+
+
+@case("get_whitelist_entry")
+async def _get_whitelist_entry(db, ds, rng):
+    if rng.random() < 0.5:
+        return await db.get_whitelist_entry("arma", rng.choice(ds.arma_ids))
+    return await db.get_whitelist_entry("steam", rng.choice(ds.steam_ids))
+
+
+@case("get_whitelist_entries_for")
+async def _get_whitelist_entries_for(db, ds, rng):
+    keys = [("arma", a) for a in rng.sample(ds.arma_ids, 10)] + [("steam", s) for s in rng.sample(ds.steam_ids, 10)]
+    return await db.get_whitelist_entries_for(keys)
+
+
+@case("get_application_by_identifier")
+async def _get_application_by_identifier(db, ds, rng):
+    ident = rng.choice(ds.arma_ids) if rng.random() < 0.5 else rng.choice(ds.steam_ids)
+    return await db.get_application_by_identifier(ident)
+
+
+@case("get_archived_application_by_identifier")
+async def _get_archived_application_by_identifier(db, ds, rng):
+    ident = rng.choice(ds.arma_ids) if rng.random() < 0.5 else rng.choice(ds.steam_ids)
+    return await db.get_archived_application_by_identifier(ident)
+
+
+@case("get_pending_applications")
+async def _get_pending_applications(db, ds, rng):
+    return await db.get_pending_applications()
+
+
+@case("get_pending_page")
+async def _get_pending_page(db, ds, rng):
+    after = rng.choice(ds.app_ids) if rng.random() < 0.8 else None
+    platform = rng.choice((None, "PC", "XBOX"))
+    return await db.get_pending_page(after_id=after, platform=platform)
+
+
+@case("create_application")
+async def _create_application(db, ds, rng):
+    return await db.create_application(
+        user_id=rng.randint(1, 10**17),
+        username="bench",
+        arma_id=rng.choice(ds.arma_ids),
+        platform="PC",
+        steam_id=rng.choice(ds.steam_ids),
+    )
+
+
+@case("update_status")
+async def _update_status(db, ds, rng):
+    return await db.update_status(rng.choice(ds.app_ids), rng.choice(("pending", "approved", "rejected")))
+
+
+@case("update_fields")
+async def _update_fields(db, ds, rng):
+    return await db.update_fields(rng.choice(ds.app_ids), {"username": f"bench{rng.randint(0, 999)}"})
+
+
+@case("update_status_with_comment")
+async def _update_status_with_comment(db, ds, rng):
+    return await db.update_status_with_comment(rng.choice(ds.app_ids), "rejected", "bench", 1)
+
+
+@case("bulk_update_status")
+async def _bulk_update_status(db, ds, rng):
+    return await db.bulk_update_status(rng.sample(ds.app_ids, min(100, len(ds.app_ids))), "rejected", "bench", 1, ("pending", "approved"))
+
+
+@case("rebuild_whitelist_current")
+async def _rebuild_whitelist_current(db, ds, rng):
+    return await db.rebuild_whitelist_current()
+
+
+@case("get_application_stats")
+async def _get_application_stats(db, ds, rng):
+    return await db.get_application_stats()
+
+
+@case("rebuild_application_stats")
+async def _rebuild_application_stats(db, ds, rng):
+    return await db.rebuild_application_stats()
+
+
+@case("archive_applications")
+async def _archive_applications(db, ds, rng):
+    return await db.archive_applications(batch_size=100, max_batches=1)
+
+
+@case("get_state")
+async def _get_state(db, ds, rng):
+    return await db.get_state("whitelist_generation")
+
+
+@case("set_state")
+async def _set_state(db, ds, rng):
+    return await db.set_state("bench", str(rng.randint(0, 10**9)))
+
+
+@case("get_admin_message")
+async def _get_admin_message(db, ds, rng):
+    return await db.get_admin_message(rng.choice(ds.app_ids))
+
+
+@case("set_admin_message")
+async def _set_admin_message(db, ds, rng):
+    app_id = rng.choice(ds.app_ids)
+    return await db.set_admin_message(app_id, 300000000000000000, 500000000000000000 + app_id)
+
+
+@case("enqueue_notification")
+async def _enqueue_notification(db, ds, rng):
+    ds.notification_ids.append(await db.enqueue_notification(rng.choice(ds.user_ids), NOTIFICATION_PAYLOAD))
+
+
+@case("enqueue_notifications")
+async def _enqueue_notifications(db, ds, rng):
+    return await db.enqueue_notifications((rng.choice(ds.user_ids), NOTIFICATION_PAYLOAD) for _ in range(50))
+
+
+@case("get_due_notifications")
+async def _get_due_notifications(db, ds, rng):
+    return await db.get_due_notifications()
+
+
+@case("reschedule_notification")
+async def _reschedule_notification(db, ds, rng):
+    return await db.reschedule_notification(rng.choice(ds.notification_ids), 60, "bench")
+
+
+@case("delete_notification")
+async def _delete_notification(db, ds, rng):
+    # Каждый вызов удаляет существующую строку, пока очередь не опустеет.
+    notification_id = ds.notification_ids.pop() if ds.notification_ids else 0
+    return await db.delete_notification(notification_id)
+
+
+@case("insert_join_attempts")
+async def _insert_join_attempts(db, ds, rng):
+    # Пакет, который журнал проверок сбрасывает за один раз.
+    return await db.insert_join_attempts(list(generate_join_attempts(100, ds.arma_ids, ds.steam_ids, rng.randint(0, 10**9), days=1)))
+
+
+@case("get_join_attempt_summary")
+async def _get_join_attempt_summary(db, ds, rng):
+    since = (datetime.utcnow() - timedelta(hours=rng.choice((1, 24, 24 * 7)))).strftime("%Y-%m-%d %H:%M:%S")
+    return await db.get_join_attempt_summary(since)
+
+
+@case("prune_join_attempts")
+async def _prune_join_attempts(db, ds, rng):
+    return await db.prune_join_attempts(30)
+
+
+async def run_cases(path: str, ds: Dataset, iterations: Dict[str, int], seed: int, only: List[str]) -> Dict[str, dict]:
+    """Прогоняет выбранные сценарии на одном соединении Database."""
+    db = Database(path)
+    await db.connect()
+    results: Dict[str, dict] = {}
+    try:
+        for name, fn in CASES.items():
+            if only and name not in only:
+                continue
+            rng = random.Random(seed)
+            n = iterations.get(name, iterations["default"])
+            for _ in range(min(20, n)):
+                await fn(db, ds, rng)
+            samples = []
+            for _ in range(n):
+                t0 = time.perf_counter()
+                await fn(db, ds, rng)
+                samples.append(time.perf_counter() - t0)
+            results[name] = summarize(samples)
+    finally:
+        await db.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, action="append", help="размер таблицы applications (можно несколько раз)")
+    parser.add_argument("--iterations", type=int, default=500, help="число вызовов на метод")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", action="append", default=[], help="замерить только указанные методы")
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    sizes = args.rows or [10_000, 100_000, 1_000_000]
+    # Полная выгрузка pending на больших таблицах дорогая — делаем меньше повторов.
+    iterations = {
+        "default": args.iterations,
+        "get_pending_applications": max(5, args.iterations // 50),
+        "bulk_update_status": max(5, args.iterations // 10),
+        "archive_applications": max(5, args.iterations // 10),
+        "rebuild_whitelist_current": 3,
+        "rebuild_application_stats": 3,
+        "get_join_attempt_summary": max(5, args.iterations // 10),
+        "prune_join_attempts": max(5, args.iterations // 10),
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, f"bench_{rows}.db")
+            t0 = time.perf_counter()
+            ds = build_dataset(path, rows, seed=args.seed)
+            seed_side_tables(ds, seed=args.seed)
+            generation = time.perf_counter() - t0
+            results[str(rows)] = {
+                "generation_s": round(generation, 3),
+                "db_size_bytes": os.path.getsize(path),
+                "methods": asyncio.run(run_cases(path, ds, iterations, args.seed, args.only)),
+            }
+
+    write_results(
+        "database",
+        {"rows": sizes, "iterations": args.iterations, "seed": args.seed},
+        results,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
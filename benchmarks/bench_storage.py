@@ -0,0 +1,112 @@
+"""Размер базы и латентность поиска при хранении идентификаторов в text и compact.
+
+База генерируется в формате text, замеряется, затем конвертируется в compact
+(Database(identifier_storage="compact")), сжимается VACUUM и замеряется снова.
+
+Пример:
+    python -m benchmarks.bench_storage --rows 100000 --output bench_storage.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.common import summarize, write_results
+from benchmarks.synthetic import Dataset, build_dataset
+from src.db import Database
+
+OBJECTS = (
+    "applications",
+    "applications_archive",
+    "whitelist_current",
+    "idx_applications_arma_id",
+    "idx_applications_steam_id",
+)
+
+
+def measure_pages(path: str) -> Dict[str, object]:
+    """VACUUM и размер по таблицам/индексам из dbstat."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("VACUUM")
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = dict(conn.execute("SELECT name, COUNT(*) FROM dbstat GROUP BY name"))
+        total = conn.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "page_size": page_size,
+        "total_pages": total,
+        "file_bytes": os.path.getsize(path),
+        "pages": {name: pages.get(name, 0) for name in OBJECTS},
+    }
+
+
+async def open_with(path: str, storage: str) -> None:
+    """Открыть базу в заданном режиме (при необходимости — конвертация)."""
+    db = Database(path, identifier_storage=storage)
+    await db.connect()
+    await db.close()
+
+
+async def measure_lookups(path: str, ds: Dataset, iterations: int, seed: int, storage: str) -> Dict[str, dict]:
+    db = Database(path, identifier_storage=storage)
+    await db.connect()
+    results: Dict[str, dict] = {}
+    cases = {
+        "get_whitelist_entry_arma": lambda rng: db.get_whitelist_entry("arma", rng.choice(ds.arma_ids)),
+        "get_whitelist_entry_steam": lambda rng: db.get_whitelist_entry("steam", rng.choice(ds.steam_ids)),
+        "get_application_by_identifier": lambda rng: db.get_application_by_identifier(
+            rng.choice(ds.arma_ids) if rng.random() < 0.5 else rng.choice(ds.steam_ids)
+        ),
+    }
+    try:
+        for name, fn in cases.items():
+            rng = random.Random(seed)
+            for _ in range(min(20, iterations)):
+                await fn(rng)
+            samples: List[float] = []
+            for _ in range(iterations):
+                t0 = time.perf_counter()
+                await fn(rng)
+                samples.append(time.perf_counter() - t0)
+            results[name] = summarize(samples)
+    finally:
+        await db.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, action="append", help="размер таблицы applications (можно несколько раз)")
+    parser.add_argument("--iterations", type=int, default=2000, help="число поисков на сценарий")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    sizes = args.rows or [100_000, 1_000_000]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, f"storage_{rows}.db")
+            ds = build_dataset(path, rows, seed=args.seed)
+            per_size = {}
+            for storage in ("text", "compact"):
+                t0 = time.perf_counter()
+                asyncio.run(open_with(path, storage))
+                per_size[storage] = {
+                    "convert_s": round(time.perf_counter() - t0, 3),
+                    "size": measure_pages(path),
+                    "lookups": asyncio.run(measure_lookups(path, ds, args.iterations, args.seed, storage)),
+                }
+            results[str(rows)] = per_size
+
+    write_results("storage", {"rows": sizes, "iterations": args.iterations, "seed": args.seed}, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Латентность подачи заявки (ApplicationModal.on_submit) с заглушкой Steam.
+
+ack — время до первого ответа Discord (должно укладываться в 3 секунды),
+done — до сообщения с результатом.
+
+Пример:
+    python -m benchmarks.bench_submit --steam-delay 0 --steam-delay 1 --submissions 50 --output bench_submit.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import uuid
+from typing import Dict, List
+
+from benchmarks.common import summarize, write_results
+from benchmarks.fakes import FakeInteraction, FakeUser, StubSteamServer
+
+
+async def run_scenario(db_path: str, submissions: int, concurrency: int, latency: float, seed: int) -> Dict[str, object]:
+    from src.bot import ApplicationModal
+    from src.db import Database
+
+    db = Database(db_path)
+    await db.connect()
+    rng = random.Random(seed)
+    sem = asyncio.Semaphore(concurrency)
+    interactions: List[FakeInteraction] = []
+
+    async def submit(i: int) -> None:
+        modal = ApplicationModal(db)
+        modal.nickname._value = f"bench{i}"
+        modal.armaid._value = str(uuid.UUID(int=rng.getrandbits(128)))
+        modal.platform._value = "PC"
+        modal.steamid._value = str(76561197960265728 + rng.randint(1, 10**9))
+        async with sem:
+            interaction = FakeInteraction(FakeUser(rng.randint(1, 10**17)), latency=latency)
+            interactions.append(interaction)
+            await modal.on_submit(interaction)
+
+    try:
+        await asyncio.gather(*(submit(i) for i in range(submissions)))
+    finally:
+        await db.close()
+
+    acks = [i.ack_latency for i in interactions if i.ack_latency is not None]
+    done = [i.done_latency for i in interactions if i.done_latency is not None]
+    return {
+        "submissions": submissions,
+        "ack": summarize(acks),
+        "done": summarize(done),
+        "ack_over_3s": sum(1 for a in acks if a >= 3.0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steam-delay", type=float, action="append", help="задержка ответа Steam, с (можно несколько раз)")
+    parser.add_argument("--submissions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=5, help="одновременных подач")
+    parser.add_argument("--discord-latency", type=float, default=0.05, help="имитация задержки Discord REST, с")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+    delays = args.steam_delay or [0.0, 0.5, 2.0]
+
+    os.environ.setdefault("DISCORD_TOKEN", "bench")
+    os.environ["STEAM_API_KEY"] = "bench"
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for delay in delays:
+            for open_profile in (True, False):
+                name = f"delay={delay}s,{'open' if open_profile else 'closed'}"
+                with StubSteamServer(delay=delay, open_profile=open_profile) as steam:
+                    os.environ["STEAM_API_BASE"] = steam.url
+                    path = os.path.join(tmp, f"submit_{len(results)}.db")
+                    results[name] = asyncio.run(
+                        run_scenario(path, args.submissions, args.concurrency, args.discord_latency, args.seed)
+                    )
+
+    write_results(
+        "submit",
+        {
+            "steam_delays": delays,
+            "submissions": args.submissions,
+            "concurrency": args.concurrency,
+            "discord_latency": args.discord_latency,
+            "seed": args.seed,
+        },
+        results,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
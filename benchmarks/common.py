@@ -0,0 +1,49 @@
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Сводка по замерам (секунды) в микросекундах."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        idx = min(len(ordered) - 1, max(0, int(round(p / 100 * (len(ordered) - 1)))))
+        return ordered[idx] * 1e6
+
+    return {
+        "count": len(ordered),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 2),
+        "min_us": round(ordered[0] * 1e6, 2),
+        "p50_us": round(pct(50), 2),
+        "p95_us": round(pct(95), 2),
+        "p99_us": round(pct(99), 2),
+        "max_us": round(ordered[-1] * 1e6, 2),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Метаданные окружения, чтобы результаты можно было сравнивать между релизами."""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def write_results(suite: str, params: Dict[str, Any], results: Dict[str, Any], output: Optional[str]) -> None:
+    """Печатает результаты в JSON (stdout или файл)."""
+    payload = {"suite": suite, "env": environment(), "params": params, "results": results}
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,203 @@
+"""Подделки Discord‑взаимодействий и Steam Web API для замеров без сети.
+
+FakeInteraction повторяет ту часть discord.Interaction, которой пользуются
+модалки, вьюхи и слэш‑команды бота, и запоминает моменты ответов.
+StubSteamServer — локальный HTTP‑сервер с ответами Steam и настраиваемой задержкой.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional
+from urllib.parse import urlparse
+
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str = "bench", roles: Optional[list] = None):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{user_id}>"
+        self.roles = roles or []
+
+    async def send(self, *args, **kwargs) -> None:
+        pass
+
+
+class FakeMessage:
+    """Сообщение, которое бот редактирует (карточка заявки в админ‑канале)."""
+
+    def __init__(self, message_id: int, latency: float = 0.0):
+        self.id = message_id
+        self.latency = latency
+        self.edits = 0
+
+    async def edit(self, **kwargs) -> "FakeMessage":
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.edits += 1
+        return self
+
+
+class _Recorder:
+    """Общие часы взаимодействия: время создания, первый ответ и все отправки."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.started = time.perf_counter()
+        self.acked_at: Optional[float] = None
+        self.sent: List[tuple] = []
+
+    async def call(self, kind: str, payload: Any) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        now = time.perf_counter()
+        if self.acked_at is None:
+            self.acked_at = now
+        self.sent.append((now, kind, payload))
+
+
+class FakeResponse:
+    def __init__(self, recorder: _Recorder):
+        self._rec = recorder
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, kind: str, payload: Any) -> None:
+        if self._done:
+            raise RuntimeError("interaction already responded")
+        self._done = True
+        await self._rec.call(kind, payload)
+
+    async def defer(self, *, ephemeral: bool = False, thinking: bool = False) -> None:
+        await self._respond("defer", {"ephemeral": ephemeral, "thinking": thinking})
+
+    async def send_message(self, content: Optional[str] = None, **kwargs) -> None:
+        await self._respond("send_message", {"content": content, **kwargs})
+
+    async def send_modal(self, modal) -> None:
+        await self._respond("send_modal", modal)
+
+    async def edit_message(self, **kwargs) -> None:
+        await self._respond("edit_message", kwargs)
+
+
+class FakeFollowup:
+    def __init__(self, recorder: _Recorder):
+        self._rec = recorder
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> None:
+        await self._rec.call("followup", {"content": content, **kwargs})
+
+
+class FakeInteraction:
+    """Минимальная замена discord.Interaction.
+
+    latency — имитация времени ответа Discord REST на каждый вызов.
+    """
+
+    def __init__(self, user: FakeUser, client: Any = None, data: Optional[dict] = None,
+                 latency: float = 0.0, guild: Any = None, message: Any = None):
+        self._rec = _Recorder(latency)
+        self.user = user
+        self.client = client
+        self.data = data or {}
+        self.guild = guild
+        self.message = message
+        self.channel = None
+        self.response = FakeResponse(self._rec)
+        self.followup = FakeFollowup(self._rec)
+
+    @property
+    def ack_latency(self) -> Optional[float]:
+        """Секунды от создания взаимодействия до первого ответа Discord."""
+        return None if self._rec.acked_at is None else self._rec.acked_at - self._rec.started
+
+    @property
+    def done_latency(self) -> Optional[float]:
+        """Секунды до последнего отправленного сообщения."""
+        return self._rec.sent[-1][0] - self._rec.started if self._rec.sent else None
+
+    @property
+    def sent(self) -> List[tuple]:
+        """[(время, вид, данные)] всех ответов по порядку."""
+        return list(self._rec.sent)
+
+
+def steam_payloads(open_profile: bool) -> dict:
+    """Ответы трёх методов Steam, которые вызывает check_profile_open."""
+    return {
+        "/ISteamUser/GetPlayerSummaries/v2/": {"response": {"players": [
+            {"communityvisibilitystate": 3 if open_profile else 1, "profilestate": 1}
+        ]}},
+        "/IPlayerService/GetOwnedGames/v1/": {"response": {
+            "game_count": 1 if open_profile else 0,
+            "games": [{"appid": 1874880, "name": "Arma Reforger", "playtime_forever": 600}] if open_profile else [],
+        }},
+        "/IPlayerService/GetRecentlyPlayedGames/v1/": {"response": {"total_count": 1 if open_profile else 0}},
+    }
+
+
+class StubSteamServer:
+    """Локальный Steam Web API: фиксированные ответы с задержкой delay секунд.
+
+    error_rate — доля запросов, на которые отвечается 500.
+    """
+
+    def __init__(self, delay: float = 0.0, open_profile: bool = True, error_rate: float = 0.0, seed: int = 1):
+        self.delay = delay
+        self.open_profile = open_profile
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if stub.error_rate and stub._rng.random() < stub.error_rate:
+                    stub.errors += 1
+                    self.send_response(500)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = steam_payloads(stub.open_profile).get(urlparse(self.path).path)
+                data = json.dumps(body or {}).encode()
+                self.send_response(200 if body else 404)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "StubSteamServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubSteamServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
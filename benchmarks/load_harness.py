@@ -0,0 +1,311 @@
+"""Сквозная нагрузка на бота без Discord и Steam.
+
+Поднимает настоящий WhitelistBot (build_bot) на временной базе, заглушку Steam
+и прогоняет фазы «шторма»: подача заявок (ApplicationModal), решения админов
+(AdminDecisionView, RejectReasonModal), слэш‑команды пользователей и админов.
+Для каждой фазы — пропускная способность, задержки ответа и блокировки event loop.
+
+Пример:
+    python -m benchmarks.load_harness --users 500 --concurrency 50 --steam-delay 0.3 --output load.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+import uuid
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.common import summarize, write_results
+from benchmarks.fakes import FakeInteraction, FakeMessage, FakeUser, StubSteamServer
+
+STEAM_ID64_BASE = 76561197960265728
+
+
+class LoopLagMonitor:
+    """Меряет, насколько позже запланированного просыпается event loop.
+
+    Задержка больше threshold считается блокировкой loop (синхронный код,
+    долгие вызовы без await).
+    """
+
+    def __init__(self, interval: float = 0.005, threshold: float = 0.01):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - t0 - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def reset(self) -> List[float]:
+        samples, self.samples = self.samples, []
+        return samples
+
+    def report(self, samples: List[float]) -> Dict[str, object]:
+        blocked = [s for s in samples if s > self.threshold]
+        return {
+            "lag": summarize(samples),
+            "blocked_s": round(sum(blocked), 4),
+            "blocked_events": len(blocked),
+        }
+
+
+def _outcome(interaction: FakeInteraction) -> str:
+    """Итог взаимодействия по последнему ответу: заголовок embed'а или вид ответа."""
+    if not interaction.sent:
+        return "no_response"
+    _, kind, payload = interaction.sent[-1]
+    embed = payload.get("embed") if isinstance(payload, dict) else None
+    if embed is not None and embed.title:
+        return re.sub(r"#\d+", "#N", embed.title)
+    return kind
+
+
+class Harness:
+    def __init__(self, bot, db, concurrency: int, discord_latency: float, seed: int):
+        self.bot = bot
+        self.db = db
+        self.concurrency = concurrency
+        self.discord_latency = discord_latency
+        self.rng = random.Random(seed)
+        self.monitor = LoopLagMonitor()
+        self.admin = FakeUser(1, "admin")
+        self.results: Dict[str, dict] = {}
+
+    def interaction(self, user: FakeUser, **kwargs) -> FakeInteraction:
+        return FakeInteraction(user, client=self.bot, latency=self.discord_latency, **kwargs)
+
+    async def phase(self, name: str, ops: List[Callable[[], Awaitable[Optional[FakeInteraction]]]]) -> None:
+        """Выполнить операции с ограничением параллелизма и записать сводку фазы."""
+        sem = asyncio.Semaphore(self.concurrency)
+        interactions: List[FakeInteraction] = []
+        errors: Counter = Counter()
+
+        async def run(op) -> None:
+            async with sem:
+                try:
+                    interaction = await op()
+                    if interaction is not None:
+                        interactions.append(interaction)
+                except Exception as e:
+                    errors[type(e).__name__] += 1
+
+        self.monitor.reset()
+        t0 = time.perf_counter()
+        await asyncio.gather(*(run(op) for op in ops))
+        wall = time.perf_counter() - t0
+        background = await drain_background()
+        lag = self.monitor.reset()
+
+        self.results[name] = {
+            "operations": len(ops),
+            "wall_s": round(wall, 3),
+            "throughput_ops": round(len(ops) / wall, 1) if wall else None,
+            "ack": summarize([i.ack_latency for i in interactions if i.ack_latency is not None]),
+            "done": summarize([i.done_latency for i in interactions if i.done_latency is not None]),
+            "outcomes": dict(Counter(_outcome(i) for i in interactions)),
+            "errors": dict(errors),
+            "background_tasks": background,
+            "loop": self.monitor.report(lag),
+        }
+
+
+async def drain_background(timeout: float = 60.0) -> int:
+    """Дождаться безымянных фоновых задач бота (карточки, массовые обновления)."""
+    current = asyncio.current_task()
+    pending = [
+        t for t in asyncio.all_tasks()
+        if t is not current and not t.done() and t.get_name().startswith("Task-")
+    ]
+    if pending:
+        await asyncio.wait(pending, timeout=timeout)
+    return len(pending)
+
+
+def patch_discord_side(bot, db, latency: float) -> None:
+    """Заменяем вызовы, которым нужен подключённый к Discord клиент."""
+
+    async def has_admin_role(user) -> bool:
+        return getattr(user, "id", user) == 1
+
+    async def post_admin_card(app) -> None:
+        await bot.build_admin_embed(app)
+        if latency:
+            await asyncio.sleep(latency)
+        await db.set_admin_message(app.id, 1, app.id)
+
+    async def refresh_admin_card(app) -> None:
+        await bot.build_admin_embed(app)
+        if latency:
+            await asyncio.sleep(latency)
+
+    bot.has_admin_role = has_admin_role
+    bot.post_admin_card = post_admin_card
+    bot.refresh_admin_card = refresh_admin_card
+
+
+async def run(args) -> Dict[str, object]:
+    from src.bot import AdminDecisionView, ApplicationModal, RejectReasonModal, build_bot
+    from src.db import Database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "load.db"))
+        await db.connect()
+        bot = build_bot(db)
+        patch_discord_side(bot, db, args.discord_latency)
+        h = Harness(bot, db, args.concurrency, args.discord_latency, args.seed)
+        h.monitor.start()
+        rng = h.rng
+
+        users = [FakeUser(10_000 + i, f"player{i}") for i in range(args.users)]
+        identities = {
+            u.id: (str(uuid.UUID(int=rng.getrandbits(128))), str(STEAM_ID64_BASE + rng.randint(1, 10**9)))
+            for u in users
+        }
+
+        def submit(user: FakeUser):
+            async def op():
+                modal = ApplicationModal(db)
+                arma_id, steam_id = identities[user.id]
+                modal.nickname._value = user.name
+                modal.armaid._value = arma_id
+                modal.platform._value = "PC" if rng.random() < 0.8 else rng.choice(("XBOX", "PS"))
+                modal.steamid._value = steam_id
+                interaction = h.interaction(user)
+                await modal.on_submit(interaction)
+                return interaction
+            return op
+
+        try:
+            await h.phase("submit", [submit(u) for u in users])
+
+            pending = await db.get_pending_applications()
+            rng.shuffle(pending)
+            cut = int(len(pending) * args.approve_ratio)
+
+            def approve(app_id: int):
+                async def op():
+                    view = AdminDecisionView(bot, db, app_id)
+                    interaction = h.interaction(h.admin, data={"custom_id": f"admin_approve_{app_id}"})
+                    await view.approve_btn(interaction)
+                    return interaction
+                return op
+
+            def reject(app_id: int):
+                async def op():
+                    view = AdminDecisionView(bot, db, app_id)
+                    message = FakeMessage(app_id, args.discord_latency)
+                    click = h.interaction(h.admin, data={"custom_id": f"admin_reject_{app_id}"}, message=message)
+                    await view.reject_btn(click)
+                    modal: RejectReasonModal = click.sent[0][2]
+                    modal.reason._value = "Нагрузочный тест"
+                    interaction = h.interaction(h.admin, message=message)
+                    await modal.on_submit(interaction)
+                    return interaction
+                return op
+
+            await h.phase("decide", [approve(a.id) for a in pending[:cut]] + [reject(a.id) for a in pending[cut:]])
+
+            status = bot.tree.get_command("status")
+
+            def user_status(user: FakeUser):
+                async def op():
+                    interaction = h.interaction(user)
+                    await status.callback(interaction)
+                    return interaction
+                return op
+
+            await h.phase("status", [user_status(rng.choice(users)) for _ in range(args.users)])
+
+            by_identifier = bot.tree.get_command("status_by_identifier")
+
+            def lookup(identifier: str):
+                async def op():
+                    interaction = h.interaction(h.admin)
+                    await by_identifier.callback(interaction, identifier)
+                    return interaction
+                return op
+
+            idents = [v for pair in identities.values() for v in pair]
+            await h.phase("status_by_identifier", [lookup(rng.choice(idents)) for _ in range(args.users)])
+
+            pending_cmd = bot.tree.get_command("pending")
+
+            def pending_page():
+                async def op():
+                    interaction = h.interaction(h.admin)
+                    await pending_cmd.callback(interaction, None, None)
+                    return interaction
+                return op
+
+            await h.phase("pending", [pending_page() for _ in range(max(1, args.users // 10))])
+
+            bulk_remove = bot.tree.get_command("bulk_remove_from_whitelist")
+            approved = [a.id for a in pending[:cut]]
+
+            def bulk(chunk: List[int]):
+                async def op():
+                    interaction = h.interaction(h.admin)
+                    await bulk_remove.callback(interaction, " ".join(map(str, chunk)), None)
+                    return interaction
+                return op
+
+            chunks = [approved[i:i + 50] for i in range(0, len(approved), 50)]
+            await h.phase("bulk_remove_from_whitelist", [bulk(c) for c in chunks])
+        finally:
+            await h.monitor.stop()
+            await db.close()
+
+    total = [r["wall_s"] for r in h.results.values()]
+    h.results["_total"] = {
+        "wall_s": round(sum(total), 3),
+        "blocked_s": round(statistics.fsum(r["loop"]["blocked_s"] for r in h.results.values()), 4),
+    }
+    return h.results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="игроков, подающих заявки")
+    parser.add_argument("--concurrency", type=int, default=20, help="одновременных взаимодействий")
+    parser.add_argument("--approve-ratio", type=float, default=0.7, help="доля одобряемых заявок")
+    parser.add_argument("--steam-delay", type=float, default=0.2, help="задержка ответа Steam, с")
+    parser.add_argument("--steam-error-rate", type=float, default=0.0, help="доля ответов Steam с ошибкой 500")
+    parser.add_argument("--discord-latency", type=float, default=0.05, help="имитация задержки Discord REST, с")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DISCORD_TOKEN", "bench")
+    os.environ["STEAM_API_KEY"] = "bench"
+    os.environ["ARCHIVE_REJECTED_DAYS"] = "0"
+
+    with StubSteamServer(delay=args.steam_delay, error_rate=args.steam_error_rate, seed=args.seed) as steam:
+        os.environ["STEAM_API_BASE"] = steam.url
+        results = asyncio.run(run(args))
+        results["_steam"] = {"requests": steam.requests, "errors": steam.errors}
+
+    write_results("load", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
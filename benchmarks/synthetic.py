@@ -0,0 +1,178 @@
+import asyncio
+import json
+import random
+import sqlite3
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+
+from src.db import Database
+
+STATUS_WEIGHTS = (("approved", 60), ("rejected", 25), ("pending", 15))
+PLATFORM_WEIGHTS = (("PC", 70), ("XBOX", 20), ("PS", 10))
+SUBMISSIONS_WEIGHTS = ((1, 70), (2, 20), (3, 7), (4, 3))
+
+
+@dataclass
+class Dataset:
+    """Сгенерированная база и выборки ключей для замеров."""
+    path: str
+    rows: int
+    user_ids: List[int] = field(default_factory=list)
+    app_ids: List[int] = field(default_factory=list)
+    arma_ids: List[str] = field(default_factory=list)
+    steam_ids: List[str] = field(default_factory=list)
+    notification_ids: List[int] = field(default_factory=list)
+
+
+def _pick(rng: random.Random, weights):
+    values, w = zip(*weights)
+    return rng.choices(values, weights=w, k=1)[0]
+
+
+def _steam_id(rng: random.Random) -> str:
+    return "7656119" + "".join(rng.choices("0123456789", k=10))
+
+
+def _arma_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_rows(rows: int, seed: int = 1):
+    """Генерирует строки applications: у части игроков несколько переподач,
+    старые заявки отклонены, последняя — в смешанном статусе."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    span = 600 * 24 * 3600
+    user_id = 100000000000000000
+    produced = 0
+    while produced < rows:
+        user_id += rng.randint(1, 5000)
+        platform = _pick(rng, PLATFORM_WEIGHTS)
+        steam_id = _steam_id(rng) if platform == "PC" else ""
+        arma_id = _arma_id(rng)
+        submissions = min(_pick(rng, SUBMISSIONS_WEIGHTS), rows - produced)
+        created = start + timedelta(seconds=rng.randrange(span))
+        for n in range(submissions):
+            last = n == submissions - 1
+            if not last and rng.random() < 0.2:
+                arma_id = _arma_id(rng)
+            status = _pick(rng, STATUS_WEIGHTS) if last else "rejected"
+            updated = created + timedelta(seconds=rng.randint(60, 3 * 24 * 3600))
+            admin_id = None if status == "pending" else 200000000000000000 + rng.randint(1, 20)
+            comment = None
+            if status == "rejected":
+                comment = "Профиль закрыт"
+            elif status == "approved":
+                comment = "Пользователь добавлен в Whitelist"
+            yield (
+                user_id,
+                f"player{user_id % 1000000}",
+                arma_id,
+                platform,
+                steam_id,
+                status,
+                created.strftime("%Y-%m-%d %H:%M:%S"),
+                updated.strftime("%Y-%m-%d %H:%M:%S"),
+                comment,
+                admin_id,
+            )
+            produced += 1
+            created = updated + timedelta(seconds=rng.randint(60, 7 * 24 * 3600))
+
+
+NOTIFICATION_PAYLOAD = {
+    "title": "Заявка в Whitelist",
+    "description": "Статус: **отклонена**",
+    "color": 0xe74c3c,
+    "fields": [
+        {"name": "Комментарий администратора", "value": "```Профиль закрыт```", "inline": False},
+        {"name": "Что делать дальше?", "value": "Вы можете повторно подать заявку через кнопку в канале.", "inline": False},
+    ],
+}
+
+
+def generate_join_attempts(count: int, arma_ids: List[str], steam_ids: List[str], seed: int = 1, days: int = 60):
+    """Журнал проверок за последние days дней; примерно каждая пятая — отказ."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for _ in range(count):
+        created = now - timedelta(seconds=rng.randrange(days * 24 * 3600))
+        if rng.random() < 0.5:
+            id_type, identifier = "arma", rng.choice(arma_ids)
+        else:
+            id_type, identifier = "steam", rng.choice(steam_ids)
+        yield (
+            created.strftime("%Y-%m-%d %H:%M:%S"),
+            id_type,
+            identifier,
+            int(rng.random() >= 0.2),
+            rng.randint(50, 5000),
+            f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+        )
+
+
+def build_dataset(path: str, rows: int, seed: int = 1, sample: int = 1000) -> Dataset:
+    """Создаёт базу со схемой Database и заполняет её синтетическими заявками."""
+
+    async def _init_schema():
+        db = Database(path)
+        await db.connect()
+        await db.close()
+
+    asyncio.run(_init_schema())
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO applications (user_id, username, arma_id, platform, steam_id, status,
+                                      created_at, updated_at, admin_comment, admin_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            generate_rows(rows, seed),
+        )
+    conn.execute("ANALYZE")
+
+    rng = random.Random(seed + 1)
+    ds = Dataset(path=path, rows=rows)
+    ds.app_ids = [r[0] for r in conn.execute(
+        "SELECT id FROM applications ORDER BY RANDOM() LIMIT ?", (sample,))]
+    ds.user_ids = [r[0] for r in conn.execute(
+        "SELECT user_id FROM applications ORDER BY RANDOM() LIMIT ?", (sample,))]
+    ds.arma_ids = [r[0] for r in conn.execute(
+        "SELECT arma_id FROM applications ORDER BY RANDOM() LIMIT ?", (sample,))]
+    ds.steam_ids = [r[0] for r in conn.execute(
+        "SELECT steam_id FROM applications WHERE steam_id != '' ORDER BY RANDOM() LIMIT ?", (sample,))]
+    conn.close()
+
+    # Примерно четверть запросов — промахи (игроки без заявки).
+    ds.arma_ids += [_arma_id(rng) for _ in range(len(ds.arma_ids) // 3)]
+    ds.steam_ids += [_steam_id(rng) for _ in range(len(ds.steam_ids) // 3)]
+    rng.shuffle(ds.arma_ids)
+    rng.shuffle(ds.steam_ids)
+    return ds
+
+
+def seed_side_tables(ds: Dataset, seed: int = 1) -> None:
+    """Заполняет служебные таблицы: карточки всех заявок, очередь ЛС и журнал проверок."""
+    rng = random.Random(seed + 2)
+    conn = sqlite3.connect(ds.path)
+    with conn:
+        conn.execute(
+            "INSERT INTO admin_messages (app_id, channel_id, message_id) "
+            "SELECT id, 300000000000000000, 400000000000000000 + id FROM applications"
+        )
+        conn.executemany(
+            "INSERT INTO notifications (user_id, payload, next_attempt_at) VALUES (?, ?, datetime('now', '-1 minute'))",
+            [(rng.choice(ds.user_ids), json.dumps(NOTIFICATION_PAYLOAD, ensure_ascii=False)) for _ in range(2000)],
+        )
+        conn.executemany(
+            "INSERT INTO join_attempts (created_at, id_type, identifier, whitelisted, latency_us, remote_addr) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            generate_join_attempts(ds.rows, ds.arma_ids, ds.steam_ids, seed),
+        )
+    ds.notification_ids = [r[0] for r in conn.execute("SELECT id FROM notifications ORDER BY id")]
+    conn.execute("ANALYZE")
+    conn.close()
@@ -1,59 +1,192 @@
 
-from flask import Flask, Response, jsonify, abort
+from flask import Flask, Response, jsonify, abort, request
 import asyncio
+import atexit
+import math
+import sqlite3
+import threading
+import time
 from typing import Optional
 
-from src.config import get_database_path
-from src.db import Database
+from src.audit import AuditLog, SqliteAuditWriter
+from src.cache import NegativeCache
+from src.config import (
+    get_api_rate_limit,
+    get_api_rate_limit_exempt,
+    get_database_path,
+    get_negative_cache_ttl,
+    get_whitelist_index_path,
+    join_audit_enabled,
+)
+from src.db import WHITELIST_GENERATION_KEY, Database
+from src.identifiers import normalize_arma_id, normalize_steam_id
+from src.throttle import TokenBucketLimiter
+from src.whitelist_index import WhitelistIndex
 
 app = Flask(__name__)
 
+_index: Optional[WhitelistIndex] = None
+_audit: Optional[AuditLog] = None
+_audit_lock = threading.Lock()
+# Счётчик поколения читается не чаще раза в GENERATION_CHECK_INTERVAL секунд
+# через одно общее read-only соединение.
+GENERATION_CHECK_INTERVAL = 1.0
+_generation_lock = threading.Lock()
+_generation_conn: Optional[sqlite3.Connection] = None
+_generation: tuple[float, Optional[str]] = (float("-inf"), None)
+negative_cache = NegativeCache(ttl=get_negative_cache_ttl())
+_rate, _burst = get_api_rate_limit()
+limiter: Optional[TokenBucketLimiter] = TokenBucketLimiter(_rate, _burst, exempt=get_api_rate_limit_exempt()) if _rate > 0 else None
+
+@app.before_request
+def throttle():
+    """429 с Retry-After, если клиент превысил лимит запросов."""
+    if limiter is None:
+        return None
+    wait = limiter.acquire(request.remote_addr or "")
+    if wait > 0:
+        response = jsonify({"error": "too many requests"})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(math.ceil(wait))
+        return response
+    return None
+
 def run_async(coro):
     return asyncio.run(coro)
 
 def get_db() -> Database:
     database_path = get_database_path()
     db = Database(database_path)
-    run_async(db.connect())
+    # Схему и миграции применяет бот; API только читает.
+    run_async(db.connect(migrate=False))
     return db
 
+def get_index() -> Optional[WhitelistIndex]:
+    """Индекс whitelist из файла, если он настроен и уже выгружен ботом."""
+    global _index
+    path = get_whitelist_index_path()
+    if not path:
+        return None
+    if _index is None or _index.path != path:
+        _index = WhitelistIndex(path)
+    return _index if _index.available else None
+
+def whitelist_generation() -> Optional[str]:
+    """Счётчик изменений whitelist из bot_state (кэшируется на GENERATION_CHECK_INTERVAL)."""
+    global _generation, _generation_conn
+    now = time.monotonic()
+    if now - _generation[0] < GENERATION_CHECK_INTERVAL:
+        return _generation[1]
+    with _generation_lock:
+        if now - _generation[0] < GENERATION_CHECK_INTERVAL:
+            return _generation[1]
+        try:
+            if _generation_conn is None:
+                _generation_conn = sqlite3.connect(
+                    f"file:{get_database_path()}?mode=ro", uri=True, check_same_thread=False
+                )
+            row = _generation_conn.execute(
+                "SELECT value FROM bot_state WHERE key = ?", (WHITELIST_GENERATION_KEY,)
+            ).fetchone()
+            value: Optional[str] = row[0] if row else "0"
+        except sqlite3.Error:
+            # Без счётчика кэш нельзя проверить — считаем, что данные сменились.
+            if _generation_conn is not None:
+                _generation_conn.close()
+                _generation_conn = None
+            value = None
+        _generation = (now, value)
+        return value
+
+def get_audit() -> Optional[AuditLog]:
+    """Журнал проверок (создаётся при первом запросе в каждом воркере)."""
+    global _audit
+    if _audit is None and join_audit_enabled():
+        with _audit_lock:
+            if _audit is None:
+                audit = AuditLog(SqliteAuditWriter(get_database_path()))
+                audit.start()
+                atexit.register(audit.stop)
+                _audit = audit
+    return _audit
+
+def respond(id_type: str, identifier: str, whitelisted: bool, linked_key: str, linked: Optional[str], started: float):
+    """Ответ API; проверка ставится в журнал без ожидания записи."""
+    audit = get_audit()
+    if audit is not None:
+        audit.record(id_type, identifier, whitelisted, int((time.perf_counter() - started) * 1e6), request.remote_addr)
+    return jsonify({"whitelisted": whitelisted, linked_key: linked})
+
+def cached_lookup(id_type: str, identifier: str, lookup) -> tuple[bool, Optional[str]]:
+    """Поиск с кэшем отказов: повторные попытки не в whitelist не доходят до базы."""
+    index = get_index()
+    if index is not None:
+        negative_cache.sync_generation(index.generation)
+    elif negative_cache.ttl > 0:
+        generation = whitelist_generation()
+        negative_cache.sync_generation(generation if generation is not None else object())
+    cached = negative_cache.get(id_type, identifier)
+    if cached is not None:
+        return cached
+    result = lookup(index, identifier)
+    if not result[0]:
+        negative_cache.put(id_type, identifier, result)
+    return result
+
+def lookup_arma(index: Optional[WhitelistIndex], aid: str) -> tuple[bool, Optional[str]]:
+    if index is not None:
+        return index.lookup_arma(aid) or (False, None)
+    db = get_db()
+    try:
+        entry = run_async(db.get_whitelist_entry("arma", aid))
+        if entry and entry.steam_id:
+            return entry.whitelisted, entry.steam_id
+        else:
+            return bool(entry and entry.whitelisted), None
+    finally:
+        run_async(db.close())
+
+def lookup_steam(index: Optional[WhitelistIndex], sid: str) -> tuple[bool, Optional[str]]:
+    if index is not None:
+        whitelisted, arma_id = index.lookup_steam(sid) or (False, None)
+        return (whitelisted, arma_id) if arma_id else (False, None)
+    db = get_db()
+    try:
+        entry = run_async(db.get_whitelist_entry("steam", sid))
+        if entry and entry.arma_id:
+            return entry.whitelisted, entry.arma_id
+        else:
+            return False, None
+    finally:
+        run_async(db.close())
+
 @app.get("/api/whitelist/armaId/<arma_id>")
 def get_by_arma_id(arma_id: str):
+    started = time.perf_counter()
     if not arma_id:
         abort(400)
-    aid = arma_id.strip().lower()
-    if not aid:
+    if not arma_id.strip():
         abort(400)
-    db = get_db()
     try:
-        steam_id = run_async(db.get_steam_id_by_arma_id(aid))
-        whitelisted = run_async(db.is_whitelisted_by_arma_id(aid))
-        if steam_id:
-            return jsonify({"whitelisted": whitelisted, "steamId": steam_id})
-        else:
-            return jsonify({"whitelisted": whitelisted, "steamId": None})
-    finally:
-        run_async(db.close())
+        aid = normalize_arma_id(arma_id)
+    except ValueError:
+        return respond("arma", arma_id.strip(), False, "steamId", None, started)
+    whitelisted, steam_id = cached_lookup("arma", aid, lookup_arma)
+    return respond("arma", aid, whitelisted, "steamId", steam_id, started)
 
 @app.get("/api/whitelist/steamId/<steam_id>")
 def get_by_steam_id(steam_id: str):
+    started = time.perf_counter()
     if not steam_id:
         abort(400)
-    sid = steam_id.strip().lower()
-    if not sid:
+    if not steam_id.strip():
         abort(400)
-    db = get_db()
     try:
-        arma_id = run_async(db.get_arma_id_by_steam_id(sid))
-        whitelisted = run_async(db.is_whitelisted_by_steam_id(sid))
-        if arma_id:
-            return jsonify({"whitelisted": whitelisted, "armaId": arma_id})
-        else:
-            return jsonify({"whitelisted": False, "armaId": None})
-    finally:
-        run_async(db.close())
+        sid = normalize_steam_id(steam_id)
+    except ValueError:
+        return respond("steam", steam_id.strip(), False, "armaId", None, started)
+    whitelisted, arma_id = cached_lookup("steam", sid, lookup_steam)
+    return respond("steam", sid, whitelisted, "armaId", arma_id, started)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
-
-
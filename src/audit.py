@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional, Sequence
+
+from src.db import INSERT_JOIN_ATTEMPT_SQL, JOIN_ATTEMPTS_SQL
+
+# Строка журнала: (created_at, id_type, identifier, whitelisted, latency_us, remote_addr).
+AuditRow = tuple
+AuditWriter = Callable[[Sequence[AuditRow]], None]
+
+
+class SqliteAuditWriter:
+    """Запись пакетов журнала в SQLite отдельным соединением (из потока AuditLog)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def __call__(self, rows: Sequence[AuditRow]) -> None:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._conn.executescript(JOIN_ATTEMPTS_SQL)
+        with self._conn:
+            self._conn.executemany(INSERT_JOIN_ATTEMPT_SQL, rows)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class AuditLog:
+    """Журнал проверок игроков: кольцевой буфер в памяти + фоновая запись пакетами.
+
+    record() только кладёт строку в deque и никогда не ждёт базу. Если запись
+    не успевает, самые старые строки вытесняются (счётчик dropped). Способ
+    записи задаётся writer'ом — по умолчанию SqliteAuditWriter.
+    """
+
+    def __init__(
+        self,
+        writer: AuditWriter,
+        capacity: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._buffer: "deque[AuditRow]" = deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Запустить поток записи."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="join-audit", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Дописать буфер и остановить поток."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def record(
+        self,
+        id_type: str,
+        identifier: str,
+        whitelisted: bool,
+        latency_us: Optional[int] = None,
+        remote_addr: Optional[str] = None,
+    ) -> None:
+        """Поставить проверку в очередь на запись."""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        created_at = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        self._buffer.append((created_at, id_type, identifier[:128], int(whitelisted), latency_us, remote_addr))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _drain(self) -> List[AuditRow]:
+        rows = []
+        while self._buffer and len(rows) < self.batch_size:
+            rows.append(self._buffer.popleft())
+        return rows
+
+    def flush(self) -> int:
+        """Записать всё накопленное. Возвращает число записанных строк."""
+        written = 0
+        while True:
+            rows = self._drain()
+            if not rows:
+                return written
+            try:
+                self.writer(rows)
+                written += len(rows)
+            except Exception as e:
+                self.dropped += len(rows)
+                print(f"Ошибка записи журнала проверок ({len(rows)} строк отброшено): {e}")
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+        self.flush()
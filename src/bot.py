@@ -1,18 +1,45 @@
 import asyncio
-from typing import Optional
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
 import re
 
 import discord
-from discord.ext import commands
-
-from src.config import get_settings
-from src.db import Database, ApplicationStatus
+from discord.ext import commands, tasks
+
+from src.cache import EmbedCache
+from src.config import get_api_rate_limit, get_api_rate_limit_exempt, get_settings, join_audit_enabled
+from src.db import WHITELIST_GENERATION_KEY, Application, ApplicationStatus, Database
+from src.embedded_api import EmbeddedApi
+from src.identifiers import normalize_arma_id, normalize_steam_id, parse_identifier
+from src.notifier import NotificationWorker
+from src.whitelist_index import export_whitelist_index
 import src.steam_api as steam_api
 
 INTENTS = discord.Intents.default()
 INTENTS.members = True
 INTENTS.message_content = True
 
+
+def build_client_options(low_memory_members: bool) -> dict:
+    """Интенты и настройки кэша участников.
+
+    В режиме low_memory участники не кэшируются и не запрашиваются чанками при
+    старте: роли берутся из payload взаимодействия, а при необходимости участник
+    подгружается через API.
+    """
+    if not low_memory_members:
+        return {"intents": INTENTS}
+    intents = discord.Intents.default()
+    intents.members = False
+    intents.message_content = True
+    return {
+        "intents": intents,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+    }
+
 STATUS_TEXT = {
     "pending": "В ожидании",
     "approved": "Подтверждена",
@@ -25,6 +52,29 @@ STATUS_COLOR = {
     "rejected": 0xE74C3C,
 }
 
+def parse_targets(raw: str) -> tuple[list[int], list[str], list[str]]:
+    """Разбирает список целей для массовых команд.
+
+    Возвращает (номера заявок, ArmaID/SteamID64, нераспознанные значения).
+    """
+    app_ids: list[int] = []
+    identifiers: list[str] = []
+    invalid: list[str] = []
+    for token in re.split(r"[\s,;]+", raw.strip()):
+        token = token.strip().lstrip("#")
+        if not token:
+            continue
+        if token.isdigit() and len(token) <= 12:
+            app_ids.append(int(token))
+            continue
+        parsed = parse_identifier(token)
+        if parsed:
+            identifiers.append(parsed[1])
+        else:
+            invalid.append(token)
+    return app_ids, identifiers, invalid
+
+
 def get_status_ui(status: str) -> tuple[str, int]:
     """Возвращает подпись и цвет для статуса заявки."""
     return (
@@ -32,6 +82,17 @@ def get_status_ui(status: str) -> tuple[str, int]:
         STATUS_COLOR.get(status, 0x95A5A6),
     )
 
+def format_duration(seconds: float) -> str:
+    """Приблизительная длительность: «40 мин», «5.5 ч», «3 д»."""
+    if seconds < 60:
+        return "до 1 мин"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} мин"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} ч"
+    return f"{seconds / 86400:.1f} д"
+
+
 class ApplicationModal(discord.ui.Modal):
     """Форма подачи или повторной подачи заявки."""
     def __init__(self, db: Database, is_resubmit: bool = False, original_app_id: int = None, original_data: dict = None):
@@ -82,8 +143,14 @@ class ApplicationModal(discord.ui.Modal):
             self.title = "Повторная подача заявки"
 
     async def on_submit(self, interaction: discord.Interaction):
-        """Проверяем поля и создаём или обновляем заявку."""
+        """Сразу откладываем ответ, затем проверяем поля, профиль Steam и сохраняем заявку.
+
+        Заявка пишется в базу только после проверки профиля Steam, так что
+        закрытый профиль не оставляет следов. Результат отправляется через followup.
+        """
         assert interaction.user is not None
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
         user_id = interaction.user.id
         nickname = str(self.nickname).strip()
         armaid = str(self.armaid).strip()
@@ -99,17 +166,19 @@ class ApplicationModal(discord.ui.Modal):
             )
             embed.add_field(name="Допустимые значения", value="PC, XBOX, PS", inline=False)
             embed.set_footer(text="Подсказка: можно вводить в любом регистре")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        if not armaid or len(armaid) != 36:
+        try:
+            armaid = normalize_arma_id(armaid)
+        except ValueError:
             embed = discord.Embed(
                 title="Ошибка в поле 'Arma ID'",
                 description="Формат указан неверно.",
                 color=0xe74c3c
             )
             embed.add_field(name="Ожидаемый формат", value="ArmaID: 36 символов (UUID), например: 123e4567-e89b-12d3-a456-426614174000", inline=False)
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
         if platform_norm == "PC":
@@ -121,9 +190,13 @@ class ApplicationModal(discord.ui.Modal):
                     color=0xe74c3c
                 )
                 embed.add_field(name="Пример SteamID64", value="76561198000000000", inline=True)
-                await interaction.response.send_message(embed=embed, ephemeral=True)
+                await interaction.followup.send(embed=embed, ephemeral=True)
                 return
-            valid_steam = bool(re.fullmatch(r"\d{17}", steamid)) or bool(re.fullmatch(r"STEAM_[0-5]:[01]:\d+", steamid, flags=re.IGNORECASE))
+            try:
+                steamid = normalize_steam_id(steamid)
+                valid_steam = bool(steamid)
+            except ValueError:
+                valid_steam = False
             if not valid_steam:
                 embed = discord.Embed(
                     title="Ошибка в поле 'SteamID'",
@@ -132,83 +205,104 @@ class ApplicationModal(discord.ui.Modal):
                 )
                 embed.add_field(name="Ожидаемый формат", value="SteamID64: 17 цифр", inline=False)
                 embed.add_field(name="Пример", value="76561198000000000", inline=False)
-                await interaction.response.send_message(embed=embed, ephemeral=True)
+                await interaction.followup.send(embed=embed, ephemeral=True)
                 return
-            
+
             settings = get_settings()
-            if settings.steam_api_key and steamid:
-                try:
-                    import asyncio as _asyncio
-                    profile_check = await _asyncio.to_thread(steam_api.check_profile_open, settings.steam_api_key, steamid)
-                    if not profile_check.get('open', False):
-                        embed = discord.Embed(
-                            title="Ваш профиль Steam закрыт",
-                            description="Ваш Steam профиль не является публичным или игровая информация скрыта.",
-                            color=0xe74c3c
-                        )
-                        embed.add_field(
-                            name="Что нужно сделать", 
-                            value="• Сделайте профиль публичным\n• Откройте игровую информацию\n• Убедитесь, что у вас не стоит галочка 'Скрывать общее время в игре'", 
-                            inline=False
-                        )
-                        embed.add_field(
-                            name="Как открыть профиль", 
-                            value="1. Зайдите в настройки Steam\n2. Приватность → Мой профиль → Открытый\n3. Приватность → Доступ к игровой информации → Открытый", 
-                            inline=False
-                        )
-                        await interaction.response.send_message(embed=embed, ephemeral=True)
-                        return
-                except Exception:
-                    pass
+            if settings.steam_api_key and not await profile_is_open(settings.steam_api_key, steamid):
+                await interaction.followup.send(embed=build_profile_closed_embed(), ephemeral=True)
+                return
+        else:
+            try:
+                steamid = normalize_steam_id(steamid)
+            except ValueError:
+                steamid = ""
 
-        if self.is_resubmit and self.original_app_id:
-            fields = {
-                "username": nickname,
-                "arma_id": armaid,
-                "platform": platform_norm,
-                "steam_id": steamid
-            }
-            await self.db.update_fields(self.original_app_id, fields)
-            await self.db.update_status(self.original_app_id, "pending")
+        try:
+            app_id_for_admin = await self._save(interaction, user_id, nickname, armaid, platform_norm, steamid)
+        except Exception:
+            await interaction.followup.send(embed=build_save_failed_embed(), ephemeral=True)
+            raise
 
+        if self.is_resubmit and self.original_app_id:
             embed = discord.Embed(
                 title="Заявка обновлена",
                 description="Статус: Ожидание\n\nЗаявка обновлена и отправлена на повторное рассмотрение.",
                 color=0xf39c12,
                 timestamp=discord.utils.utcnow()
             )
-            app_id_for_admin = self.original_app_id
-            
         else:
-            app_id = await self.db.create_application(
-                user_id=user_id,
-                username=nickname,
-                arma_id=armaid,
-                platform=platform_norm,
-                steam_id=steamid,
-            )
-
             embed = discord.Embed(
                 title="Заявка отправлена",
                 description="Статус: Ожидание\n\nСпасибо! Заявка отправлена на рассмотрение.",
                 color=0x27ae60,
                 timestamp=discord.utils.utcnow()
             )
-            app_id_for_admin = app_id
-            
 
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
-        settings = get_settings()
         bot = interaction.client
-        if settings.admin_channel_id and bot:
-            channel = bot.get_channel(settings.admin_channel_id)
-            if isinstance(channel, (discord.TextChannel, discord.Thread)):
-                app = await self.db.get_application(app_id_for_admin)
-                if app:
-                    view = AdminDecisionView(bot, self.db, app_id_for_admin)
-                    admin_embed = await bot.build_admin_embed(app)
-                    await channel.send(embed=admin_embed, view=view)
+        if isinstance(bot, WhitelistBot):
+            bot.spawn(bot.publish_application(app_id_for_admin))
+
+    async def _save(self, interaction: discord.Interaction, user_id: int, nickname: str,
+                    armaid: str, platform_norm: str, steamid: str) -> int:
+        """Записать новую заявку или переподачу. Возвращает ID заявки."""
+        if self.is_resubmit and self.original_app_id:
+            fields = {
+                "username": nickname,
+                "arma_id": armaid,
+                "platform": platform_norm,
+                "steam_id": steamid,
+                "status": "pending",
+            }
+            await self.db.update_fields(self.original_app_id, fields)
+            if isinstance(interaction.client, WhitelistBot):
+                interaction.client.embed_cache.invalidate(self.original_app_id)
+            return self.original_app_id
+        return await self.db.create_application(
+            user_id=user_id,
+            username=nickname,
+            arma_id=armaid,
+            platform=platform_norm,
+            steam_id=steamid,
+        )
+
+
+async def profile_is_open(api_key: str, steamid: str) -> bool:
+    """Проверить профиль Steam в потоке; ошибки Steam не мешают подать заявку."""
+    try:
+        result = await asyncio.to_thread(steam_api.check_profile_open, api_key, steamid)
+    except Exception:
+        return True
+    return bool(result.get('open', False))
+
+
+def build_save_failed_embed() -> discord.Embed:
+    return discord.Embed(
+        title="Не удалось сохранить заявку",
+        description="Произошла ошибка при сохранении. Попробуйте отправить заявку ещё раз чуть позже.",
+        color=0xe74c3c
+    )
+
+
+def build_profile_closed_embed() -> discord.Embed:
+    embed = discord.Embed(
+        title="Ваш профиль Steam закрыт",
+        description="Ваш Steam профиль не является публичным или игровая информация скрыта.",
+        color=0xe74c3c
+    )
+    embed.add_field(
+        name="Что нужно сделать", 
+        value="• Сделайте профиль публичным\n• Откройте игровую информацию\n• Убедитесь, что у вас не стоит галочка 'Скрывать общее время в игре'", 
+        inline=False
+    )
+    embed.add_field(
+        name="Как открыть профиль", 
+        value="1. Зайдите в настройки Steam\n2. Приватность → Мой профиль → Открытый\n3. Приватность → Доступ к игровой информации → Открытый", 
+        inline=False
+    )
+    return embed
 
 class ApplyView(discord.ui.View):
     def __init__(self, db: Database):
@@ -254,21 +348,166 @@ class ApplyView(discord.ui.View):
 
 class WhitelistBot(commands.Bot):
     """Бот для управления заявками в whitelist."""
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, embedded_api: Optional[EmbeddedApi] = None):
         """Настраиваем бота и подключаем нужные вьюхи/кнопки."""
-        super().__init__(command_prefix=commands.when_mentioned, intents=INTENTS)
+        settings = get_settings()
+        super().__init__(command_prefix=commands.when_mentioned, **build_client_options(settings.low_memory_members))
         self.db = db
+        self.embedded_api = embedded_api
+        self.embed_cache = EmbedCache()
+        self.notifier = NotificationWorker(self, self.db)
+        self._apply_message_checked = False
+        self.index_path = settings.whitelist_index_path
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_dirty = False
+        self._refresh_full = False
+        self._refresh_keys: set[tuple[str, str]] = set()
+        self._exported_generation: Optional[str] = None
+        self._background: set[asyncio.Task] = set()
         self.add_view(ApplyView(self.db))
 
+    def command_tree_hash(self, scope: str) -> str:
+        """Хэш описания слэш‑команд (имена, параметры, описания) и области синхронизации."""
+        commands_data = sorted(
+            (cmd.to_dict(self.tree) for cmd in self.tree.get_commands()),
+            key=lambda data: (data.get("type", 1), data["name"]),
+        )
+        payload = json.dumps({"scope": scope, "commands": commands_data}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def sync_commands(self) -> None:
+        """Синхронизируем слэш‑команды, только если они изменились с прошлого запуска.
+
+        По умолчанию команды глобальные (доступны и в ЛС с ботом). С
+        SYNC_COMMANDS_TO_GUILD они регистрируются только на сервере GUILD_ID.
+        """
+        settings = get_settings()
+        guild = discord.Object(id=settings.guild_id) if settings.sync_commands_to_guild and settings.guild_id else None
+        scope = f"guild:{guild.id}" if guild else "global"
+        digest = self.command_tree_hash(scope)
+        stored = await self.db.get_state("command_tree_hash")
+        if stored == digest:
+            print("Слэш‑команды не изменились, синхронизация пропущена")
+            return
+
+        previous_scope = await self.db.get_state("command_tree_scope")
+        if guild is None:
+            await self.tree.sync()
+            if previous_scope and previous_scope.startswith("guild:"):
+                old_guild = discord.Object(id=int(previous_scope.split(":", 1)[1]))
+                self.tree.clear_commands(guild=old_guild)
+                await self.tree.sync(guild=old_guild)
+        else:
+            self.tree.copy_global_to(guild=guild)
+            await self.tree.sync(guild=guild)
+            if previous_scope in (None, "global"):
+                # Убираем глобальные копии, иначе на сервере команды задвоятся.
+                global_commands = self.tree.get_commands()
+                self.tree.clear_commands(guild=None)
+                try:
+                    await self.tree.sync()
+                finally:
+                    for cmd in global_commands:
+                        self.tree.add_command(cmd)
+        await self.db.set_state("command_tree_hash", digest)
+        await self.db.set_state("command_tree_scope", scope)
+
     async def setup_hook(self) -> None:
         """Синхронизируем слэш‑команды с Discord без дублирования."""
         try:
-            await self.tree.sync()
+            await self.sync_commands()
         except Exception:
             import traceback
             traceback.print_exc()
 
         await self._restore_admin_views()
+        self.notifier.start()
+        if self.embedded_api is not None:
+            await self.embedded_api.start()
+        self.schedule_whitelist_refresh(delay=0)
+        settings = get_settings()
+        if settings.archive_rejected_days > 0 or settings.join_attempts_retention_days > 0:
+            self.archive_loop.start()
+
+    async def close(self) -> None:
+        """Останавливаем фоновые задачи и закрываем соединение с Discord."""
+        self.archive_loop.cancel()
+        await self.notifier.stop()
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        if self.embedded_api is not None:
+            await self.embedded_api.stop()
+        await super().close()
+
+    @tasks.loop(hours=6)
+    async def archive_loop(self) -> None:
+        """Периодически переносим старые отклонённые заявки в архив и чистим журнал проверок."""
+        settings = get_settings()
+        if settings.archive_rejected_days > 0:
+            try:
+                moved = await self.db.archive_applications(settings.archive_rejected_days)
+                if moved:
+                    print(f"В архив перенесено заявок: {moved}")
+                    self.schedule_whitelist_refresh()
+            except Exception as e:
+                print(f"Ошибка архивации заявок: {e}")
+        if settings.join_attempts_retention_days > 0:
+            try:
+                await self.db.prune_join_attempts(settings.join_attempts_retention_days)
+            except Exception as e:
+                print(f"Ошибка очистки журнала проверок: {e}")
+
+    def spawn(self, coro) -> asyncio.Task:
+        """Запустить фоновую задачу; бот держит ссылку на неё до завершения."""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    def schedule_whitelist_refresh(self, apps: Optional[Iterable[Application]] = None, delay: float = 1.0) -> None:
+        """Обновить копии whitelist для API: файл индекса и/или встроенный API.
+
+        apps — изменённые заявки: встроенный API обновляется только по их
+        идентификаторам; None — полная перезагрузка. Файл индекса
+        перевыгружается, только если сменилось поколение whitelist.
+        Изменения за delay секунд объединяются в одно обновление.
+        """
+        if not self.index_path and self.embedded_api is None:
+            return
+        if apps is None:
+            self._refresh_full = True
+        else:
+            for app in apps:
+                if app.arma_id:
+                    self._refresh_keys.add(("arma", app.arma_id))
+                if app.steam_id:
+                    self._refresh_keys.add(("steam", app.steam_id))
+        self._refresh_dirty = True
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_whitelist(delay), name="whitelist-refresh")
+
+    async def _refresh_whitelist(self, delay: float) -> None:
+        while self._refresh_dirty:
+            await asyncio.sleep(delay)
+            self._refresh_dirty = False
+            full, keys = self._refresh_full, self._refresh_keys
+            self._refresh_full, self._refresh_keys = False, set()
+            try:
+                if self.embedded_api is not None:
+                    if full:
+                        await self.embedded_api.refresh()
+                    elif keys:
+                        self.embedded_api.apply(keys, await self.db.get_whitelist_entries_for(keys))
+                if self.index_path:
+                    generation = await self.db.get_state(WHITELIST_GENERATION_KEY)
+                    if full or generation != self._exported_generation:
+                        await export_whitelist_index(self.db, self.index_path)
+                        self._exported_generation = generation
+            except Exception as e:
+                print(f"Ошибка обновления whitelist для API: {e}")
+                # Какие изменения не применились, неизвестно — в следующий раз перечитываем всё.
+                self._refresh_full = True
+            delay = 1.0
 
     async def _restore_admin_views(self) -> None:
         """Восстанавливаем view для всех активных заявок после рестарта."""
@@ -281,10 +520,38 @@ class WhitelistBot(commands.Bot):
             print(f"Ошибка при восстановлении admin views: {e}")
 
     async def on_ready(self) -> None:
-        """Бот запустился; проверяем стартовое сообщение с кнопкой."""
+        """Бот запустился; проверяем стартовое сообщение с кнопкой.
+
+        on_ready приходит и после каждого переподключения к gateway,
+        поэтому проверка выполняется один раз за процесс.
+        """
         print(f"Bot is running as {self.user}")
+        if self._apply_message_checked:
+            return
         await self.ensure_application_message()
-        
+
+    async def _find_apply_message(self, channel) -> Optional[int]:
+        """ID сообщения с кнопкой: сохранённый в bot_state, иначе поиск по истории."""
+        stored = await self.db.get_state("apply_message")
+        if stored:
+            channel_id, _, message_id = stored.partition(":")
+            if int(channel_id) == channel.id:
+                try:
+                    await channel.fetch_message(int(message_id))
+                    return int(message_id)
+                except discord.NotFound:
+                    return None
+
+        # Сообщение могло быть отправлено до того, как ID стали сохраняться.
+        async for message in channel.history(limit=5):
+            if (message.author == self.user and
+                message.embeds and
+                len(message.embeds) > 0 and
+                "Whitelist" in message.embeds[0].title and
+                message.components):
+                return message.id
+        return None
+
     async def ensure_application_message(self) -> None:
         """Если в канале нет сообщения с кнопкой — отправляем его."""
         settings = get_settings()
@@ -296,17 +563,8 @@ class WhitelistBot(commands.Bot):
             if not channel:
                 return
 
-            found_existing = False
-            async for message in channel.history(limit=5):
-                if (message.author == self.user and
-                    message.embeds and
-                    len(message.embeds) > 0 and
-                    "Whitelist" in message.embeds[0].title and
-                    message.components):
-                    found_existing = True
-                    break
-
-            if not found_existing:
+            message_id = await self._find_apply_message(channel)
+            if message_id is None:
                 view = ApplyView(self.db)
                 embed = discord.Embed(
                     title="Whitelist заявки - Arma Reforger",
@@ -331,28 +589,94 @@ class WhitelistBot(commands.Bot):
                 )
 
                 embed.set_footer(text="Whitelist Bot • Arma Reforger")
-                await channel.send(embed=embed, view=view)
-            else:
-                pass
+                message = await channel.send(embed=embed, view=view)
+                message_id = message.id
+
+            await self.db.set_state("apply_message", f"{channel.id}:{message_id}")
+            self._apply_message_checked = True
 
         except Exception:
             pass
 
-    async def has_admin_role(self, user_id: int) -> bool:
-        """Проверяем, что у пользователя есть нужная админ‑роль."""
+    async def publish_application(self, app_id: int) -> None:
+        """Фоновая публикация карточки заявки в админ‑канале."""
+        try:
+            app = await self.db.get_application(app_id)
+            if app:
+                await self.post_admin_card(app)
+        except Exception as e:
+            print(f"Не удалось опубликовать карточку заявки #{app_id}: {e}")
+
+    async def post_admin_card(self, app) -> None:
+        """Публикуем карточку заявки в админ‑канал или обновляем уже отправленную."""
+        settings = get_settings()
+        if not settings.admin_channel_id:
+            return
+        channel = self.get_channel(settings.admin_channel_id)
+        if not isinstance(channel, (discord.TextChannel, discord.Thread)):
+            return
+
+        view = AdminDecisionView(self, self.db, app.id)
+        embed = await self.build_admin_embed(app)
+
+        stored = await self.db.get_admin_message(app.id)
+        if stored and stored[0] == channel.id:
+            try:
+                await channel.get_partial_message(stored[1]).edit(embed=embed, view=view)
+                return
+            except discord.NotFound:
+                pass
+
+        message = await channel.send(embed=embed, view=view)
+        await self.db.set_admin_message(app.id, channel.id, message.id)
+
+    async def has_admin_role(self, user: discord.abc.User | int) -> bool:
+        """Проверяем, что у пользователя есть нужная админ‑роль.
+
+        Сначала смотрим роли из payload взаимодействия (interaction.user),
+        затем кэш участников, и только потом запрашиваем участника через API.
+        """
         settings = get_settings()
         if not settings.admin_role_id or not settings.guild_id:
             return False
+
+        member_guild = getattr(user, "guild", None)
+        if isinstance(user, discord.Member) and member_guild and member_guild.id == settings.guild_id:
+            return any(r.id == settings.admin_role_id for r in user.roles)
+
+        user_id = user if isinstance(user, int) else user.id
         guild = self.get_guild(settings.guild_id)
         if not guild:
             return False
         member = guild.get_member(user_id)
         if member is None:
-            return False
+            try:
+                member = await guild.fetch_member(user_id)
+            except discord.HTTPException:
+                return False
         return any(r.id == settings.admin_role_id for r in getattr(member, "roles", []))
 
+    async def _cached_embed(self, kind: str, app, render) -> discord.Embed:
+        """Отдаём embed из кэша по (app_id, updated_at) или рисуем заново.
+
+        Время в embed'е — момент показа, поэтому у закэшированной копии оно
+        обновляется.
+        """
+        data = self.embed_cache.get(app.id, app.updated_at, kind)
+        if data is not None:
+            embed = discord.Embed.from_dict(data)
+            if embed.timestamp is not None:
+                embed.timestamp = discord.utils.utcnow()
+            return embed
+        embed = await render(app)
+        self.embed_cache.put(app.id, app.updated_at, kind, embed.to_dict())
+        return embed
+
     async def build_admin_embed(self, app) -> discord.Embed:
         """Собираем карточку заявки для админ‑канала."""
+        return await self._cached_embed("admin", app, self._render_admin_embed)
+
+    async def _render_admin_embed(self, app) -> discord.Embed:
         text, color = get_status_ui(app.status)
         
         is_resubmit = app.admin_id is not None and app.status == "pending"
@@ -373,29 +697,92 @@ class WhitelistBot(commands.Bot):
             field_name = "Предыдущий обработчик" if is_resubmit else "Обработал"
             embed.add_field(name=field_name, value=f"**{admin_name}** (<@{app.admin_id}>)", inline=False)
 
+        field = await self._steam_hours_field(app)
+        if field:
+            embed.add_field(name=field[0], value=field[1], inline=False)
+
+        return embed
+
+    async def _steam_hours_field(self, app) -> Optional[tuple[str, str]]:
+        """Поле с наигранными часами; ответ Steam кэшируется по версии заявки."""
+        cached = self.embed_cache.get_steam(app.id, app.updated_at)
+        if cached:
+            return cached
         try:
             settings = get_settings()
             api_key = settings.steam_api_key
-            if api_key and app.steam_id:
-                import asyncio as _asyncio
-                games = await _asyncio.to_thread(steam_api.get_arma_games, api_key, app.steam_id, True)
-                if games:
-                    sorted_games = sorted(games, key=lambda x: x[1] or 0, reverse=True)
-                    lines = [f"{name} — {int(round(hours))} ч" for name, hours in sorted_games]
-                    embed.add_field(name="Количество наигранных часов", value="\n".join(lines), inline=False)
-                else:
-                    embed.add_field(name="Количество наигранных часов", value="Профиль закрыт или наигранных часов нет", inline=False)
+            if not (api_key and app.steam_id):
+                return None
+            games = await asyncio.to_thread(steam_api.get_arma_games, api_key, app.steam_id, True)
         except Exception:
-            pass
+            return None
+        if games:
+            sorted_games = sorted(games, key=lambda x: x[1] or 0, reverse=True)
+            lines = [f"{name} — {int(round(hours))} ч" for name, hours in sorted_games]
+            field = ("Количество наигранных часов", "\n".join(lines))
+        else:
+            field = ("Количество наигранных часов", "Профиль закрыт или наигранных часов нет")
+        self.embed_cache.put_steam(app.id, app.updated_at, field)
+        return field
+
+    async def build_status_embed(self, app) -> discord.Embed:
+        """Карточка для /status."""
+        return await self._cached_embed("status", app, self._render_status_embed)
+
+    async def _render_status_embed(self, app) -> discord.Embed:
+        text, color = get_status_ui(app.status)
+        embed = discord.Embed(title="Ваша заявка", description=f"**Статус:** {text}", color=color)
+
+        embed.add_field(name="Информация о игроке", value=f"**Никнейм:** {app.username}\n**Discord:** <@{app.user_id}>", inline=False)
+        if app.steam_id and re.fullmatch(r"\d{17}", str(app.steam_id)):
+            steam_field = f"[{app.steam_id}](https://steamcommunity.com/profiles/{app.steam_id})"
+        else:
+            steam_field = "-"
+        embed.add_field(name="Игровые данные", value=f"**Arma ID:** `{app.arma_id}`\n**Платформа:** `{app.platform}`\n**Steam ID:** {steam_field}", inline=False)
+
+        if app.status != "approved" and app.admin_comment:
+            embed.add_field(name="Комментарий администратора", value=f"```{app.admin_comment}```", inline=False)
 
+        if app.admin_id:
+            admin_user = self.get_user(app.admin_id)
+            admin_name = admin_user.display_name if admin_user else f"ID: {app.admin_id}"
+            embed.add_field(name="Обработал", value=f"**{admin_name}** (<@{app.admin_id}>)", inline=False)
+
+        if app.status == "rejected":
+            embed.add_field(name="Заявка отклонена", value="К сожалению, ваша заявка была отклонена.\nПовторно подать можно через кнопку в канале.", inline=False)
+
+        embed.set_footer(text="Whitelist Bot • Arma Reforger")
         return embed
 
-    async def notify_user_status_change(self, app, new_status: str, comment: Optional[str] = None):
-        """Пишем пользователю про изменение статуса заявки."""
-        user = self.get_user(app.user_id)
-        if not user:
-            return
+    async def build_lookup_embed(self, app, archived: bool = False) -> discord.Embed:
+        """Карточка для /status_by_identifier."""
+        if archived:
+            return await self._cached_embed("lookup_archived", app, self._render_archived_lookup_embed)
+        return await self._cached_embed("lookup", app, self._render_lookup_embed)
+
+    async def _render_archived_lookup_embed(self, app) -> discord.Embed:
+        return await self._render_lookup_embed(app, archived=True)
+
+    async def _render_lookup_embed(self, app, archived: bool = False) -> discord.Embed:
+        text, color = get_status_ui(app.status)
+        title = f"Информация по заявке #{app.id}" + (" (архив)" if archived else "")
+        embed = discord.Embed(title=title, description=f"**Статус:** {text}", color=color, timestamp=discord.utils.utcnow())
+        embed.add_field(name="Игрок", value=f"{app.username} (<@{app.user_id}>)", inline=False)
+        if app.steam_id and re.fullmatch(r"\d{17}", str(app.steam_id)):
+            steam_display = f"[{app.steam_id}](https://steamcommunity.com/profiles/{app.steam_id})"
+        else:
+            steam_display = "-"
+        embed.add_field(name="Данные", value=f"Arma ID: `{app.arma_id}`\nSteamID: {steam_display}\n DiscordID: `{app.user_id}`", inline=False)
+        if app.admin_comment:
+            embed.add_field(name="Комментарий администратора", value=f"```{app.admin_comment}```", inline=False)
+        if app.admin_id:
+            admin_user = self.get_user(app.admin_id)
+            admin_name = admin_user.display_name if admin_user else f"ID: {app.admin_id}"
+            embed.add_field(name="Обработал", value=f"**{admin_name}** (<@{app.admin_id}>)", inline=False)
+        return embed
 
+    def build_notification_embed(self, app, new_status: str, comment: Optional[str] = None) -> discord.Embed:
+        """Собираем ЛС пользователю про изменение статуса заявки."""
         status_info = {
             "approved": ("одобрена", 0x27ae60),
             "rejected": ("отклонена", 0xe74c3c)
@@ -421,7 +808,58 @@ class WhitelistBot(commands.Bot):
             pass
 
         embed.set_footer(text="Whitelist Bot • Arma Reforger")
-        await user.send(embed=embed)
+        return embed
+
+    async def notify_user_status_change(self, app, new_status: str, comment: Optional[str] = None):
+        """Ставим в очередь ЛС пользователю про изменение статуса заявки."""
+        embed = self.build_notification_embed(app, new_status, comment)
+        await self.db.enqueue_notification(app.user_id, embed.to_dict())
+        self.notifier.wake()
+
+    async def resolve_targets(self, raw: str) -> tuple[list[int], list[str]]:
+        """Номера заявок по списку целей + значения, которые не удалось найти."""
+        app_ids, identifiers, missing = parse_targets(raw)
+        for ident in identifiers:
+            app = await self.db.get_application_by_identifier(ident)
+            if app:
+                app_ids.append(app.id)
+            else:
+                missing.append(ident)
+        return list(dict.fromkeys(app_ids)), missing
+
+    async def refresh_admin_card(self, app) -> None:
+        """Перерисовываем сохранённую карточку заявки (кнопки выключены, если решение принято)."""
+        stored = await self.db.get_admin_message(app.id)
+        if not stored:
+            return
+        channel = self.get_channel(stored[0])
+        if not isinstance(channel, (discord.TextChannel, discord.Thread)):
+            return
+        view = AdminDecisionView(self, self.db, app.id)
+        if app.status != "pending":
+            for child in view.children:
+                child.disabled = True
+        embed = await self.build_admin_embed(app)
+        try:
+            await channel.get_partial_message(stored[1]).edit(embed=embed, view=view)
+        except discord.HTTPException:
+            pass
+
+    async def after_bulk_update(self, apps, notify_status: Optional[str], comment: Optional[str] = None) -> None:
+        """После массового решения: уведомления в очередь и обновление карточек."""
+        for app in apps:
+            self.embed_cache.invalidate(app.id)
+        if notify_status:
+            await self.db.enqueue_notifications(
+                (app.user_id, self.build_notification_embed(app, notify_status, comment).to_dict())
+                for app in apps
+            )
+            self.notifier.wake()
+        for app in apps:
+            try:
+                await self.refresh_admin_card(app)
+            except Exception as e:
+                print(f"Не удалось обновить карточку заявки #{app.id}: {e}")
 
 
 class RejectReasonModal(discord.ui.Modal):
@@ -438,11 +876,13 @@ class RejectReasonModal(discord.ui.Modal):
     async def on_submit(self, interaction: discord.Interaction):
         """Сохраняем причину, ставим rejected и обновляем карточку."""
         await self.db.update_status_with_comment(self.app_id, "rejected", str(self.reason), interaction.user.id)
-        app = await self.db.get_application(self.app_id)
-        await self.bot.notify_user_status_change(app, "rejected", str(self.reason))
+        self.bot.embed_cache.invalidate(self.app_id)
+        updated_app = await self.db.get_application(self.app_id)
+        if updated_app:
+            self.bot.schedule_whitelist_refresh([updated_app])
+        await self.bot.notify_user_status_change(updated_app, "rejected", str(self.reason))
 
         try:
-            updated_app = await self.db.get_application(self.app_id)
             view = AdminDecisionView(self.bot, self.db, self.app_id)
             for child in view.children:
                 try:
@@ -488,7 +928,7 @@ class AdminDecisionView(discord.ui.View):
 
     async def _check_admin(self, interaction: discord.Interaction) -> bool:
         """Проверяем, что у пользователя есть админ‑роль."""
-        is_admin = await self.bot.has_admin_role(interaction.user.id)
+        is_admin = await self.bot.has_admin_role(interaction.user)
         if not is_admin:
             await interaction.response.send_message("Недостаточно прав.", ephemeral=True)
             return False
@@ -502,10 +942,12 @@ class AdminDecisionView(discord.ui.View):
         app_id = int(interaction.data["custom_id"].split("_")[-1])
         
         await self.db.update_status_with_comment(app_id, "approved", "Пользователь добавлен в Whitelist", interaction.user.id)
-        app = await self.db.get_application(app_id)
-        await self.bot.notify_user_status_change(app, "approved")
-
+        self.bot.embed_cache.invalidate(app_id)
         updated_app = await self.db.get_application(app_id)
+        if updated_app:
+            self.bot.schedule_whitelist_refresh([updated_app])
+        await self.bot.notify_user_status_change(updated_app, "approved")
+
         view = AdminDecisionView(self.bot, self.db, app_id)
         for child in view.children:
             try:
@@ -524,41 +966,96 @@ class AdminDecisionView(discord.ui.View):
         
         await interaction.response.send_modal(RejectReasonModal(self.bot, self.db, app_id, message=interaction.message))
 
-def build_bot(db: Database) -> WhitelistBot:
+class PendingBrowserView(discord.ui.View):
+    """Листание очереди заявок 'pending' кнопками «назад/вперёд»."""
+    PAGE_SIZE = 10
+
+    def __init__(self, bot: WhitelistBot, db: Database, platform: Optional[str] = None, since: Optional[str] = None):
+        super().__init__(timeout=600)
+        self.bot = bot
+        self.db = db
+        self.platform = platform
+        self.since = since
+        self.first_id: Optional[int] = None
+        self.last_id: Optional[int] = None
+
+    async def load(self, after_id: Optional[int] = None, before_id: Optional[int] = None) -> discord.Embed:
+        """Загружаем страницу и обновляем состояние кнопок."""
+        apps, has_more = await self.db.get_pending_page(
+            after_id=after_id,
+            before_id=before_id,
+            limit=self.PAGE_SIZE,
+            platform=self.platform,
+            created_since=self.since,
+        )
+        if before_id is not None:
+            has_prev, has_next = has_more, True
+        else:
+            has_prev, has_next = after_id is not None, has_more
+        if apps:
+            self.first_id, self.last_id = apps[0].id, apps[-1].id
+        elif after_id is not None:
+            # Пустая страница (заявки успели разобрать): «назад» вернёт страницу до after_id включительно.
+            self.first_id, self.last_id = after_id + 1, after_id
+        elif before_id is not None:
+            self.first_id, self.last_id = before_id, before_id - 1
+        self.prev_page.disabled = not has_prev
+        self.next_page.disabled = not has_next
+
+        filters = []
+        if self.platform:
+            filters.append(f"платформа `{self.platform}`")
+        if self.since:
+            filters.append(f"с `{self.since}`")
+        description = "Фильтр: " + ", ".join(filters) if filters else None
+        embed = discord.Embed(title="Заявки в ожидании", description=description, color=STATUS_COLOR["pending"])
+        if not apps:
+            embed.add_field(name="Пусто", value="Заявок в ожидании нет.", inline=False)
+        for app in apps:
+            steam = f"\nSteamID: `{app.steam_id}`" if app.steam_id else ""
+            embed.add_field(
+                name=f"#{app.id} • {app.username}",
+                value=f"<@{app.user_id}> • `{app.platform}` • {app.created_at}\nArma ID: `{app.arma_id}`{steam}",
+                inline=False,
+            )
+        return embed
+
+    async def _turn(self, interaction: discord.Interaction, forward: bool) -> None:
+        if not await self.bot.has_admin_role(interaction.user):
+            await interaction.response.send_message("Недостаточно прав.", ephemeral=True)
+            return
+        if forward:
+            embed = await self.load(after_id=self.last_id)
+        else:
+            embed = await self.load(before_id=self.first_id)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Назад", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, forward=False)
+
+    @discord.ui.button(label="Вперёд", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, forward=True)
+
+
+def build_bot(db: Database, embedded_api: Optional[EmbeddedApi] = None) -> WhitelistBot:
     """Создаём бота и регистрируем слэш‑команды."""
-    bot = WhitelistBot(db)
+    bot = WhitelistBot(db, embedded_api)
 
     @bot.tree.command(name="status", description="Показать статус вашей заявки")
     async def status_slash(interaction: discord.Interaction):
         """Показывает статус последней заявки пользователя."""
         app = await db.get_user_latest_application(interaction.user.id)
+        if not app:
+            # Отклонённые заявки со временем переносятся в архив.
+            app = await db.get_user_latest_archived_application(interaction.user.id)
         if not app:
             embed = discord.Embed(title="Заявка не найдена", description="У вас пока нет заявок на whitelist.\n\nИспользуйте кнопку **\"Подать заявку\"** для создания новой заявки.", color=0xe74c3c)
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
-        text, color = get_status_ui(app.status)
-        embed = discord.Embed(title="Ваша заявка", description=f"**Статус:** {text}", color=color)
-
-        embed.add_field(name="Информация о игроке", value=f"**Никнейм:** {app.username}\n**Discord:** <@{app.user_id}>", inline=False)
-        if app.steam_id and re.fullmatch(r"\d{17}", str(app.steam_id)):
-            steam_field = f"[{app.steam_id}](https://steamcommunity.com/profiles/{app.steam_id})"
-        else:
-            steam_field = "-"
-        embed.add_field(name="Игровые данные", value=f"**Arma ID:** `{app.arma_id}`\n**Платформа:** `{app.platform}`\n**Steam ID:** {steam_field}", inline=False)
-        
-        if app.status != "approved" and app.admin_comment:
-            embed.add_field(name="Комментарий администратора", value=f"```{app.admin_comment}```", inline=False)
-
-        if app.admin_id:
-            admin_user = bot.get_user(app.admin_id)
-            admin_name = admin_user.display_name if admin_user else f"ID: {app.admin_id}"
-            embed.add_field(name="Обработал", value=f"**{admin_name}** (<@{app.admin_id}>)", inline=False)
-
-        if app.status == "rejected":
-            embed.add_field(name="Заявка отклонена", value="К сожалению, ваша заявка была отклонена.\nПовторно подать можно через кнопку в канале.", inline=False)
-
-        embed.set_footer(text="Whitelist Bot • Arma Reforger")
+        embed = await bot.build_status_embed(app)
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @bot.tree.command(name="help", description="Показать справку по командам")
@@ -575,7 +1072,7 @@ def build_bot(db: Database) -> WhitelistBot:
     @bot.tree.command(name="ids_by_discord", description="Показать SteamID и ArmaID по Discord ID")
     async def ids_by_discord(interaction: discord.Interaction, discord_identifier: str):
         """Вернуть SteamID и ArmaID по Discord ID."""
-        if not await bot.has_admin_role(interaction.user.id):
+        if not await bot.has_admin_role(interaction.user):
             await interaction.response.send_message("Недостаточно прав для выполнения этой команды.", ephemeral=True)
             return
 
@@ -585,7 +1082,7 @@ def build_bot(db: Database) -> WhitelistBot:
             return
 
         uid = int(m.group(1))
-        app = await db.get_user_latest_application(uid)
+        app = await db.get_user_latest_application(uid) or await db.get_user_latest_archived_application(uid)
         if not app:
             await interaction.response.send_message(f"Записи для пользователя <@{uid}> не найдены.", ephemeral=True)
             return
@@ -611,52 +1108,40 @@ def build_bot(db: Database) -> WhitelistBot:
     @bot.tree.command(name="status_by_identifier", description="Показать статус по SteamID или ArmaID")
     async def status_by_identifier(interaction: discord.Interaction, identifier: str):
         """Показать статус заявки по SteamID64 или ArmaID"""
-        if not await bot.has_admin_role(interaction.user.id):
+        if not await bot.has_admin_role(interaction.user):
             await interaction.response.send_message("Недостаточно прав для выполнения этой команды.", ephemeral=True)
             return
 
-        id_str = identifier.strip()
-        if len(id_str) == 36:
-            app = await db.get_application_by_identifier(id_str)
-        elif id_str.isdigit() and len(id_str) == 17 and id_str.startswith("765"):
+        parsed = parse_identifier(identifier)
+        if parsed:
+            id_str = parsed[1]
             app = await db.get_application_by_identifier(id_str)
         else:
             await interaction.response.send_message("Разрешено запрашивать только по ArmaID или SteamID64.", ephemeral=True)
             return
 
+        archived = False
+        if not app:
+            app = await db.get_archived_application_by_identifier(id_str)
+            archived = app is not None
+
         if not app:
             await interaction.response.send_message(f"Запись по идентификатору `{id_str}` не найдена.", ephemeral=True)
             return
 
-        text, color = get_status_ui(app.status)
-        embed = discord.Embed(title=f"Информация по заявке #{app.id}", description=f"**Статус:** {text}", color=color, timestamp=discord.utils.utcnow())
-        embed.add_field(name="Игрок", value=f"{app.username} (<@{app.user_id}>)", inline=False)
-        if app.steam_id and re.fullmatch(r"\d{17}", str(app.steam_id)):
-            steam_display = f"[{app.steam_id}](https://steamcommunity.com/profiles/{app.steam_id})"
-        else:
-            steam_display = "-"
-        embed.add_field(name="Данные", value=f"Arma ID: `{app.arma_id}`\nSteamID: {steam_display}\n DiscordID: `{app.user_id}`", inline=False)
-        if app.admin_comment:
-            embed.add_field(name="Комментарий администратора", value=f"```{app.admin_comment}```", inline=False)
-        if app.admin_id:
-            admin_user = bot.get_user(app.admin_id)
-            admin_name = admin_user.display_name if admin_user else f"ID: {app.admin_id}"
-            embed.add_field(name="Обработал", value=f"**{admin_name}** (<@{app.admin_id}>)", inline=False)
-
+        embed = await bot.build_lookup_embed(app, archived=archived)
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @bot.tree.command(name="remove_from_whitelist", description="Исключить пользователя из whitelist по идентификатору")
     async def remove_from_whitelist(interaction: discord.Interaction,identifier: str, comment: Optional[str] = None):
         """Исключить пользователя из whitelist по одному из идентификаторов."""
-        if not await bot.has_admin_role(interaction.user.id):
+        if not await bot.has_admin_role(interaction.user):
             await interaction.response.send_message("Недостаточно прав для выполнения этой команды.", ephemeral=True)
             return
 
-        ident = identifier.strip()
-
-        if len(ident) == 36:
-            app = await db.get_application_by_identifier(ident)
-        elif ident.isdigit() and len(ident) == 17 and ident.startswith("765"):
+        parsed = parse_identifier(identifier)
+        if parsed:
+            ident = parsed[1]
             app = await db.get_application_by_identifier(ident)
         else:
             await interaction.response.send_message("Команда поддерживает только ArmaID или SteamID64", ephemeral=True)
@@ -670,20 +1155,198 @@ def build_bot(db: Database) -> WhitelistBot:
             comment = "Пользователь был исключен из Whitelist"
 
         await db.update_status_with_comment(app.id, "rejected", comment, interaction.user.id)
+        bot.embed_cache.invalidate(app.id)
+        bot.schedule_whitelist_refresh([app])
 
         updated = await db.get_application(app.id)
 
         user_to_mention = updated.user_id if updated else app.user_id
         await interaction.response.send_message( f"Пользователь <@{user_to_mention}> исключён из whitelist.", ephemeral=True)
 
+    @bot.tree.command(name="rebuild_whitelist", description="Пересобрать таблицу текущего whitelist из истории заявок")
+    async def rebuild_whitelist(interaction: discord.Interaction):
+        """Пересобрать whitelist_current из applications."""
+        if not await bot.has_admin_role(interaction.user):
+            await interaction.response.send_message("Недостаточно прав для выполнения этой команды.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        count = await db.rebuild_whitelist_current()
+        bot.schedule_whitelist_refresh(delay=0)
+        await interaction.followup.send(f"Whitelist пересобран, идентификаторов: **{count}**.", ephemeral=True)
+
+    @bot.tree.command(name="join_attempts", description="Сводка отказов при входе на сервер")
+    async def join_attempts_slash(interaction: discord.Interaction, hours: Optional[int] = 24):
+        """Отказы при проверке через API за последние hours часов и самые частые нарушители."""
+        if not await bot.has_admin_role(interaction.user):
+            await interaction.response.send_message("Недостаточно прав для выполнения этой команды.", ephemeral=True)
+            return
+        hours = max(1, min(hours or 24, 24 * 90))
+        since = (datetime.now(timezone.utc) - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+        summary = await db.get_join_attempt_summary(since)
+
+        embed = discord.Embed(
+            title=f"Проверки входа за {hours} ч",
+            description=(
+                f"Всего проверок: **{summary.total}**\n"
+                f"Отказов: **{summary.denied}**\n"
+                f"Разных идентификаторов с отказом: **{summary.unique_denied}**"
+            ),
+            color=0xe74c3c if summary.denied else 0x27ae60,
+        )
+        if summary.top_denied:
+            embed.add_field(
+                name="Чаще всего",
+                value="\n".join(
+                    f"`{ident}` ({'ArmaID' if id_type == 'arma' else 'SteamID'}) — {count}, последняя {last_at}"
+                    for id_type, ident, count, last_at in summary.top_denied
+                )[:1024],
+                inline=False,
+            )
+        if summary.recent_denied:
+            embed.add_field(
+                name="Последние отказы",
+                value="\n".join(
+                    f"{created_at} `{ident}`" + (f" с {addr}" if addr else "")
+                    for id_type, ident, created_at, addr in summary.recent_denied
+                )[:1024],
+                inline=False,
+            )
+        embed.set_footer(text="Время указано в UTC")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="whitelist_stats", description="Статистика заявок и решений")
+    async def whitelist_stats_slash(interaction: discord.Interaction, days: Optional[int] = 14):
+        """Счётчики заявок по статусам и платформам, решения по дням и медиана времени рассмотрения."""
+        if not await bot.has_admin_role(interaction.user):
+            await interaction.response.send_message("Недостаточно прав для выполнения этой команды.", ephemeral=True)
+            return
+        days = max(1, min(days or 14, 90))
+        stats = await db.get_application_stats(days)
+
+        embed = discord.Embed(
+            title="Статистика whitelist",
+            description="\n".join(
+                f"{STATUS_TEXT.get(status, status)}: **{stats.by_status.get(status, 0)}**"
+                for status in ("pending", "approved", "rejected")
+            ),
+            color=0x3498db,
+        )
+        if stats.by_platform:
+            embed.add_field(
+                name="По платформам",
+                value="\n".join(
+                    f"{platform}: " + ", ".join(
+                        f"{STATUS_TEXT.get(status, status)} {counts.get(status, 0)}"
+                        for status in ("pending", "approved", "rejected")
+                    )
+                    for platform, counts in sorted(stats.by_platform.items())
+                )[:1024],
+                inline=False,
+            )
+        embed.add_field(
+            name=f"Решения за {days} д",
+            value="\n".join(
+                f"{day}: одобрено {approved}, отклонено {rejected}" for day, approved, rejected in stats.daily
+            )[-1024:] or "Решений не было",
+            inline=False,
+        )
+        if stats.median_decision_seconds is not None:
+            embed.add_field(
+                name="Медиана времени рассмотрения",
+                value=f"≈ {format_duration(stats.median_decision_seconds)} (решений: {stats.decisions})",
+                inline=False,
+            )
+        embed.set_footer(text="Даты указаны в UTC")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="pending", description="Просмотр заявок в ожидании")
+    async def pending_slash(interaction: discord.Interaction, platform: Optional[str] = None, since: Optional[str] = None):
+        """Постраничный список заявок 'pending' (фильтры: платформа, дата ГГГГ-ММ-ДД)."""
+        if not await bot.has_admin_role(interaction.user):
+            await interaction.response.send_message("Недостаточно прав для выполнения этой команды.", ephemeral=True)
+            return
+
+        platform_norm = platform.strip().upper() if platform else None
+        if platform_norm and platform_norm not in {"PC", "XBOX", "PS"}:
+            await interaction.response.send_message("Платформа: PC, XBOX или PS.", ephemeral=True)
+            return
+        if since:
+            try:
+                since = datetime.strptime(since.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+            except ValueError:
+                await interaction.response.send_message("Дата должна быть в формате ГГГГ-ММ-ДД.", ephemeral=True)
+                return
+
+        view = PendingBrowserView(bot, db, platform_norm, since)
+        embed = await view.load()
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
+    async def _run_bulk(
+        interaction: discord.Interaction,
+        targets: str,
+        status: ApplicationStatus,
+        comment: Optional[str],
+        from_statuses: tuple[ApplicationStatus, ...],
+        notify_status: Optional[str],
+        done_text: str,
+    ) -> None:
+        if not await bot.has_admin_role(interaction.user):
+            await interaction.response.send_message("Недостаточно прав для выполнения этой команды.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        app_ids, missing = await bot.resolve_targets(targets)
+        updated = await db.bulk_update_status(app_ids, status, comment, interaction.user.id, from_statuses)
+        skipped = len(app_ids) - len(updated)
+
+        lines = [f"{done_text}: **{len(updated)}**"]
+        if skipped:
+            lines.append(f"Пропущено (не в нужном статусе или не найдено): **{skipped}**")
+        if missing:
+            shown = ", ".join(f"`{m}`" for m in missing[:20])
+            more = f" и ещё {len(missing) - 20}" if len(missing) > 20 else ""
+            lines.append(f"Не распознано: {shown}{more}")
+        await interaction.followup.send("\n".join(lines), ephemeral=True)
+
+        if updated:
+            bot.schedule_whitelist_refresh(updated)
+            bot.spawn(bot.after_bulk_update(updated, notify_status, comment))
+
+    @bot.tree.command(name="bulk_approve", description="Одобрить несколько заявок (номера, ArmaID или SteamID64)")
+    async def bulk_approve(interaction: discord.Interaction, targets: str):
+        """Массовое одобрение заявок в статусе pending."""
+        await _run_bulk(interaction, targets, "approved", "Пользователь добавлен в Whitelist", ("pending",), "approved", "Одобрено заявок")
+
+    @bot.tree.command(name="bulk_reject", description="Отклонить несколько заявок с общей причиной")
+    async def bulk_reject(interaction: discord.Interaction, targets: str, reason: str):
+        """Массовое отклонение заявок в статусе pending."""
+        await _run_bulk(interaction, targets, "rejected", reason, ("pending",), "rejected", "Отклонено заявок")
+
+    @bot.tree.command(name="bulk_remove_from_whitelist", description="Исключить нескольких пользователей из whitelist")
+    async def bulk_remove_from_whitelist(interaction: discord.Interaction, targets: str, comment: Optional[str] = None):
+        """Массовое исключение из whitelist (approved → rejected)."""
+        await _run_bulk(interaction, targets, "rejected", comment or "Пользователь был исключен из Whitelist", ("approved",), None, "Исключено из whitelist")
+
     return bot
 
 
 async def main():
     settings = get_settings()
-    db = Database(settings.database_path)
+    db = Database(settings.database_path, identifier_storage=settings.identifier_storage)
     await db.connect()
-    bot = build_bot(db)
+    embedded_api = None
+    if settings.embedded_api:
+        rate_limit, rate_burst = get_api_rate_limit()
+        embedded_api = EmbeddedApi(
+            db,
+            host=settings.api_host,
+            port=settings.api_port,
+            audit=join_audit_enabled(),
+            rate_limit=rate_limit,
+            rate_burst=rate_burst,
+            rate_exempt=get_api_rate_limit_exempt(),
+        )
+    bot = build_bot(db, embedded_api)
 
     async with bot:
         await bot.start(settings.token)
@@ -0,0 +1,114 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class EmbedCache:
+    """Ограниченный LRU‑кэш отрисованных embed'ов по ключу (app_id, updated_at).
+
+    Для каждой заявки хранится только актуальная версия: при смене updated_at
+    старые embed'ы и блок с часами из Steam выбрасываются.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+
+    def _entry(self, app_id: int, updated_at: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(app_id)
+        if entry is None or entry["version"] != updated_at:
+            return None
+        self._entries.move_to_end(app_id)
+        return entry
+
+    def _writable_entry(self, app_id: int, updated_at: str) -> Dict[str, Any]:
+        entry = self._entries.get(app_id)
+        if entry is None or entry["version"] != updated_at:
+            entry = {"version": updated_at, "embeds": {}, "steam": None}
+            self._entries[app_id] = entry
+        self._entries.move_to_end(app_id)
+        return entry
+
+    def get(self, app_id: int, updated_at: str, kind: str) -> Optional[dict]:
+        """Вернуть копию сохранённых данных embed'а или None."""
+        entry = self._entry(app_id, updated_at)
+        if entry is None or kind not in entry["embeds"]:
+            return None
+        return copy.deepcopy(entry["embeds"][kind])
+
+    def put(self, app_id: int, updated_at: str, kind: str, data: dict) -> None:
+        """Сохранить данные embed'а для версии заявки."""
+        self._writable_entry(app_id, updated_at)["embeds"][kind] = copy.deepcopy(data)
+        self._evict()
+
+    def get_steam(self, app_id: int, updated_at: str) -> Optional[Tuple[str, str]]:
+        """Вернуть закэшированное поле с часами (name, value) для версии заявки."""
+        entry = self._entry(app_id, updated_at)
+        return entry["steam"] if entry else None
+
+    def put_steam(self, app_id: int, updated_at: str, field: Tuple[str, str]) -> None:
+        """Запомнить поле с часами из Steam для версии заявки."""
+        self._writable_entry(app_id, updated_at)["steam"] = field
+        self._evict()
+
+    def invalidate(self, app_id: int) -> None:
+        """Сбросить всё закэшированное для заявки."""
+        self._entries.pop(app_id, None)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NegativeCache:
+    """Короткоживущий кэш отрицательных ответов API (игрок не в whitelist).
+
+    Запись живёт ttl секунд. Кэш сбрасывается целиком при смене поколения
+    данных whitelist (sync_generation): файла индекса или счётчика в базе.
+    """
+
+    def __init__(self, ttl: float = 5.0, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._generation: Any = None
+        self._lock = threading.Lock()
+
+    def get(self, id_type: str, identifier: str) -> Optional[Any]:
+        """Вернуть сохранённый ответ или None, если его нет или он устарел."""
+        key = (id_type, identifier)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return item[1]
+
+    def put(self, id_type: str, identifier: str, value: Any) -> None:
+        """Запомнить отрицательный ответ на ttl секунд."""
+        if self.ttl <= 0:
+            return
+        key = (id_type, identifier)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def sync_generation(self, generation: Any) -> None:
+        """Сбросить кэш, если данные whitelist сменили поколение."""
+        if generation == self._generation:
+            return
+        with self._lock:
+            self._generation = generation
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
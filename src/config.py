@@ -14,6 +14,22 @@ class Settings:
     admin_role_id: int | None
     database_path: str
     steam_api_key: str | None
+    low_memory_members: bool = False
+    archive_rejected_days: int = 30
+    identifier_storage: str | None = None
+    whitelist_index_path: str | None = None
+    join_attempts_retention_days: int = 30
+    sync_commands_to_guild: bool = False
+    embedded_api: bool = False
+    api_host: str = "0.0.0.0"
+    api_port: int = 5000
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
 def get_settings() -> Settings:
@@ -24,6 +40,17 @@ def get_settings() -> Settings:
     admin_role_id = int(os.getenv("ADMIN_ROLE", "0")) or None
     database_path = os.getenv("DATABASE_PATH", "whitelist.db")
     steam_api_key = os.getenv("STEAM_API_KEY", "") or None
+    low_memory_members = _env_flag("LOW_MEMORY_MEMBERS")
+    archive_rejected_days = int(os.getenv("ARCHIVE_REJECTED_DAYS", "30"))
+    identifier_storage = os.getenv("IDENTIFIER_STORAGE", "").strip().lower() or None
+    if identifier_storage not in (None, "text", "compact"):
+        raise RuntimeError("IDENTIFIER_STORAGE must be 'text' or 'compact'")
+    whitelist_index_path = get_whitelist_index_path()
+    join_attempts_retention_days = int(os.getenv("JOIN_ATTEMPTS_RETENTION_DAYS", "30"))
+    sync_commands_to_guild = _env_flag("SYNC_COMMANDS_TO_GUILD")
+    embedded_api = _env_flag("EMBEDDED_API")
+    api_host = os.getenv("API_HOST", "0.0.0.0")
+    api_port = int(os.getenv("API_PORT", "5000"))
 
     if not token:
         raise RuntimeError("DISCORD_TOKEN is required in .env")
@@ -36,8 +63,40 @@ def get_settings() -> Settings:
         admin_role_id=admin_role_id,
         database_path=database_path,
         steam_api_key=steam_api_key,
+        low_memory_members=low_memory_members,
+        archive_rejected_days=archive_rejected_days,
+        identifier_storage=identifier_storage,
+        whitelist_index_path=whitelist_index_path,
+        join_attempts_retention_days=join_attempts_retention_days,
+        sync_commands_to_guild=sync_commands_to_guild,
+        embedded_api=embedded_api,
+        api_host=api_host,
+        api_port=api_port,
     )
 
 
 def get_database_path() -> str:
     return os.getenv("DATABASE_PATH", "whitelist.db")
+
+
+def get_whitelist_index_path() -> str | None:
+    return os.getenv("WHITELIST_INDEX_PATH", "").strip() or None
+
+
+def join_audit_enabled() -> bool:
+    return _env_flag("AUDIT_JOIN_ATTEMPTS", default=True)
+
+
+def get_negative_cache_ttl() -> float:
+    return float(os.getenv("NEGATIVE_CACHE_TTL", "5"))
+
+
+def get_api_rate_limit() -> tuple[float, int]:
+    """(запросов в секунду, размер всплеска) на клиента API; 0 — без ограничения."""
+    return float(os.getenv("API_RATE_LIMIT", "50")), int(os.getenv("API_RATE_BURST", "200"))
+
+
+def get_api_rate_limit_exempt() -> frozenset[str]:
+    """IP‑адреса без лимита запросов (игровые серверы): на 429 верификатор не кикает игрока."""
+    raw = os.getenv("API_RATE_LIMIT_EXEMPT", "127.0.0.1,::1")
+    return frozenset(ip.strip() for ip in raw.split(",") if ip.strip())
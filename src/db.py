@@ -1,8 +1,20 @@
+import json
+import sqlite3
+
 import aiosqlite
 from dataclasses import dataclass
-from typing import Optional, Literal, List, Dict, Any
+from typing import Optional, Literal, List, Dict, Any, Iterable, Iterator, Sequence, Tuple
+
+from src.identifiers import (
+    arma_id_from_bytes,
+    arma_id_to_bytes,
+    normalize_arma_id,
+    normalize_steam_id,
+    parse_identifier,
+)
 
 ApplicationStatus = Literal["pending", "approved", "rejected"]
+IdentifierStorage = Literal["text", "compact"]
 
 @dataclass
 class Application:
@@ -19,40 +31,701 @@ class Application:
     admin_id: Optional[int] = None
 
 
-SCHEMA_SQL = """
-PRAGMA journal_mode=WAL;
+@dataclass
+class WhitelistEntry:
+    id_type: Literal["arma", "steam"]
+    identifier: str
+    app_id: int
+    status: ApplicationStatus
+    approved_app_id: Optional[int]
+    arma_id: str
+    steam_id: str
+
+    @property
+    def whitelisted(self) -> bool:
+        return self.approved_app_id is not None
+
 
-CREATE TABLE IF NOT EXISTS applications (
+@dataclass
+class Notification:
+    id: int
+    user_id: int
+    payload: Dict[str, Any]
+    attempts: int
+
+
+@dataclass
+class JoinAttemptSummary:
+    total: int
+    denied: int
+    unique_denied: int
+    top_denied: List[Tuple[str, str, int, str]]
+    recent_denied: List[Tuple[str, str, str, Optional[str]]]
+
+
+@dataclass
+class ApplicationStats:
+    by_status: Dict[str, int]
+    by_platform: Dict[str, Dict[str, int]]
+    daily: List[Tuple[str, int, int]]
+    decisions: int
+    median_decision_seconds: Optional[float]
+
+
+# arma_id/steam_id объявлены как BLOB (без приведения типов): в режиме хранения
+# "text" там строки, в режиме "compact" — 16 байт UUID и INTEGER SteamID64
+# (пустой SteamID хранится как NULL).
+APPLICATIONS_COLUMNS = """
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL,
     username TEXT NOT NULL,
-    arma_id TEXT NOT NULL,
+    arma_id BLOB NOT NULL,
     platform TEXT NOT NULL,
-    steam_id TEXT NOT NULL,
+    steam_id BLOB,
     status TEXT NOT NULL CHECK (status IN ('pending','approved','rejected')) DEFAULT 'pending',
     created_at TEXT NOT NULL DEFAULT (datetime('now')),
     updated_at TEXT NOT NULL DEFAULT (datetime('now')),
     admin_comment TEXT,
     admin_id INTEGER
+"""
+
+ARCHIVE_COLUMNS = """
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    username TEXT NOT NULL,
+    arma_id BLOB NOT NULL,
+    platform TEXT NOT NULL,
+    steam_id BLOB,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    admin_comment TEXT,
+    admin_id INTEGER,
+    archived_at TEXT NOT NULL DEFAULT (datetime('now'))
+"""
+
+WHITELIST_CURRENT_COLUMNS = """
+    id_type TEXT NOT NULL CHECK (id_type IN ('arma','steam')),
+    identifier BLOB NOT NULL,
+    app_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    approved_app_id INTEGER,
+    arma_id BLOB NOT NULL,
+    steam_id BLOB,
+    PRIMARY KEY (id_type, identifier)
+"""
+
+# Журнал проверок игроков через API. Пишется пакетами из src/audit.py.
+JOIN_ATTEMPTS_SQL = """
+CREATE TABLE IF NOT EXISTS join_attempts (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    id_type TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    whitelisted INTEGER NOT NULL,
+    latency_us INTEGER,
+    remote_addr TEXT
 );
 
+CREATE INDEX IF NOT EXISTS idx_join_attempts_created ON join_attempts(created_at);
+CREATE INDEX IF NOT EXISTS idx_join_attempts_denied ON join_attempts(created_at) WHERE whitelisted = 0;
+"""
+
+INSERT_JOIN_ATTEMPT_SQL = """
+INSERT INTO join_attempts (created_at, id_type, identifier, whitelisted, latency_us, remote_addr)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+SCHEMA_SQL = f"""
+PRAGMA journal_mode=WAL;
+
+CREATE TABLE IF NOT EXISTS applications ({APPLICATIONS_COLUMNS});
+
 CREATE INDEX IF NOT EXISTS idx_applications_user_id ON applications(user_id);
 CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status);
+CREATE INDEX IF NOT EXISTS idx_applications_status_platform ON applications(status, platform);
+
+CREATE TABLE IF NOT EXISTS bot_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS admin_messages (
+    app_id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TEXT NOT NULL DEFAULT (datetime('now')),
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    last_error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_notifications_next_attempt ON notifications(next_attempt_at);
+
+CREATE TABLE IF NOT EXISTS applications_archive ({ARCHIVE_COLUMNS});
+
+CREATE INDEX IF NOT EXISTS idx_applications_archive_arma_id ON applications_archive(arma_id);
+CREATE INDEX IF NOT EXISTS idx_applications_archive_steam_id ON applications_archive(steam_id);
+CREATE INDEX IF NOT EXISTS idx_applications_archive_user_id ON applications_archive(user_id);
+{JOIN_ATTEMPTS_SQL}"""
+
+# Идентификаторы хранятся в каноничной форме (см. src/identifiers.py),
+# поэтому whitelist_current и индексы работают с колонками напрямую.
+def _whitelist_refresh_sql(id_type: str, ref: str) -> str:
+    """Пересчитать строку whitelist_current для идентификатора ref.{arma_id|steam_id}."""
+    column = "arma_id" if id_type == "arma" else "steam_id"
+    key = f"{ref}.{column}"
+    return f"""
+    DELETE FROM whitelist_current WHERE id_type = '{id_type}' AND identifier = {key};
+    INSERT INTO whitelist_current (id_type, identifier, app_id, status, approved_app_id, arma_id, steam_id)
+    SELECT '{id_type}', {key}, latest.id, latest.status, appr.id,
+           COALESCE(appr.arma_id, latest.arma_id), COALESCE(appr.steam_id, latest.steam_id)
+    FROM (SELECT id, status, arma_id, steam_id FROM applications
+          WHERE {column} = {key} ORDER BY id DESC LIMIT 1) AS latest
+    LEFT JOIN (SELECT id, arma_id, steam_id FROM applications
+               WHERE {column} = {key} AND status = 'approved' ORDER BY id DESC LIMIT 1) AS appr ON 1
+    WHERE {key} != '';"""
+
+
+# Счётчик изменений whitelist в bot_state: по нему API сбрасывает кэш отказов,
+# а бот решает, нужно ли перевыгружать индекс. Меняется только при изменениях,
+# затрагивающих одобренные заявки, — новые и отклонённые заявки ответов API
+# «в whitelist / нет» не меняют.
+WHITELIST_GENERATION_KEY = "whitelist_generation"
+
+BUMP_WHITELIST_GENERATION_SQL = f"""
+    INSERT INTO bot_state (key, value) VALUES ('{WHITELIST_GENERATION_KEY}', '1')
+    ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;"""
+
+
+def _whitelist_schema_sql() -> str:
+    """Таблица whitelist_current и триггеры, поддерживающие её по applications."""
+    new = _whitelist_refresh_sql("arma", "NEW") + _whitelist_refresh_sql("steam", "NEW")
+    old = _whitelist_refresh_sql("arma", "OLD") + _whitelist_refresh_sql("steam", "OLD")
+    return f"""
+CREATE TABLE IF NOT EXISTS whitelist_current ({WHITELIST_CURRENT_COLUMNS}) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_applications_arma_id ON applications(arma_id);
+CREATE INDEX IF NOT EXISTS idx_applications_steam_id ON applications(steam_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_whitelist_insert AFTER INSERT ON applications
+BEGIN{new}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_whitelist_update AFTER UPDATE OF arma_id, steam_id, status ON applications
+BEGIN{old}{new}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_whitelist_delete AFTER DELETE ON applications
+BEGIN{old}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_whitelist_generation_insert AFTER INSERT ON applications
+WHEN NEW.status = 'approved'
+BEGIN{BUMP_WHITELIST_GENERATION_SQL}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_whitelist_generation_update AFTER UPDATE OF arma_id, steam_id, status ON applications
+WHEN OLD.status = 'approved' OR NEW.status = 'approved'
+BEGIN{BUMP_WHITELIST_GENERATION_SQL}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_whitelist_generation_delete AFTER DELETE ON applications
+WHEN OLD.status = 'approved'
+BEGIN{BUMP_WHITELIST_GENERATION_SQL}
+END;
+"""
+
+
+WHITELIST_SQL = _whitelist_schema_sql()
+
+DROP_WHITELIST_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS trg_whitelist_insert;
+DROP TRIGGER IF EXISTS trg_whitelist_update;
+DROP TRIGGER IF EXISTS trg_whitelist_delete;
+"""
+
+# Верхние границы (в секундах) корзин гистограммы времени рассмотрения
+# pending -> approved/rejected; последняя корзина — всё, что дольше.
+# При изменении границ нужен rebuild_application_stats().
+DECISION_TIME_BUCKETS = (60, 300, 900, 1800, 3600, 7200, 21600, 43200, 86400, 172800, 259200, 604800, 1209600, 2592000)
+
+
+def _decision_bucket_sql(seconds: str) -> str:
+    """CASE‑выражение: номер корзины DECISION_TIME_BUCKETS для выражения seconds."""
+    whens = " ".join(f"WHEN {seconds} < {bound} THEN {i}" for i, bound in enumerate(DECISION_TIME_BUCKETS))
+    return f"CASE {whens} ELSE {len(DECISION_TIME_BUCKETS)} END"
+
+
+def _stats_count_sql(sign: str, ref: str) -> str:
+    """Изменить счётчик application_stats для строки ref на sign (+/-) единицу."""
+    return f"""
+    INSERT INTO application_stats (status, platform, count) VALUES ({ref}.status, {ref}.platform, {sign}1)
+    ON CONFLICT(status, platform) DO UPDATE SET count = count {sign} 1;"""
+
+
+def _stats_schema_sql() -> str:
+    """Счётчики статистики и триггеры, поддерживающие их в той же транзакции,
+    что и изменения applications/applications_archive."""
+    decision_seconds = "(julianday(NEW.updated_at) - julianday(OLD.updated_at)) * 86400"
+    table_triggers = []
+    for table, prefix in (("applications", "trg_stats"), ("applications_archive", "trg_stats_archive")):
+        table_triggers.append(f"""
+CREATE TRIGGER IF NOT EXISTS {prefix}_insert AFTER INSERT ON {table}
+BEGIN{_stats_count_sql("+", "NEW")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS {prefix}_delete AFTER DELETE ON {table}
+BEGIN{_stats_count_sql("-", "OLD")}
+END;
+""")
+    return f"""
+CREATE TABLE IF NOT EXISTS application_stats (
+    status TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (status, platform)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS application_daily_stats (
+    day TEXT PRIMARY KEY,
+    approved INTEGER NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS decision_time_histogram (
+    bucket INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+{"".join(table_triggers)}
+CREATE TRIGGER IF NOT EXISTS trg_stats_update AFTER UPDATE OF status, platform ON applications
+WHEN OLD.status != NEW.status OR OLD.platform != NEW.platform
+BEGIN{_stats_count_sql("-", "OLD")}{_stats_count_sql("+", "NEW")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_decision AFTER UPDATE OF status ON applications
+WHEN OLD.status = 'pending' AND NEW.status IN ('approved', 'rejected')
+BEGIN
+    INSERT INTO application_daily_stats (day, approved, rejected)
+    VALUES (date(NEW.updated_at), NEW.status = 'approved', NEW.status = 'rejected')
+    ON CONFLICT(day) DO UPDATE SET approved = approved + excluded.approved, rejected = rejected + excluded.rejected;
+    INSERT INTO decision_time_histogram (bucket, count)
+    SELECT {_decision_bucket_sql(decision_seconds)}, 1 WHERE true
+    ON CONFLICT(bucket) DO UPDATE SET count = count + 1;
+END;
 """
 
 
+STATS_SQL = _stats_schema_sql()
+
+# Пересчёт по текущему состоянию таблиц: переходы статусов не хранятся, поэтому
+# решение датируется updated_at, время рассмотрения считается от created_at,
+# а исключённые из whitelist заявки не отличить от отклонённых.
+REBUILD_STATS_SQL = f"""
+DELETE FROM application_stats;
+INSERT INTO application_stats (status, platform, count)
+SELECT status, platform, COUNT(*) FROM (
+    SELECT status, platform FROM applications
+    UNION ALL
+    SELECT status, platform FROM applications_archive
+) GROUP BY status, platform;
+
+DELETE FROM application_daily_stats;
+INSERT INTO application_daily_stats (day, approved, rejected)
+SELECT date(updated_at), SUM(status = 'approved'), SUM(status = 'rejected') FROM (
+    SELECT status, updated_at FROM applications WHERE status IN ('approved', 'rejected')
+    UNION ALL
+    SELECT status, updated_at FROM applications_archive
+) GROUP BY date(updated_at);
+
+DELETE FROM decision_time_histogram;
+INSERT INTO decision_time_histogram (bucket, count)
+SELECT {_decision_bucket_sql("(julianday(updated_at) - julianday(created_at)) * 86400")} AS bucket, COUNT(*) FROM (
+    SELECT created_at, updated_at FROM applications WHERE status IN ('approved', 'rejected')
+    UNION ALL
+    SELECT created_at, updated_at FROM applications_archive
+) GROUP BY bucket;
+"""
+
+
+def _histogram_median(counts: Dict[int, int]) -> Optional[float]:
+    """Медиана по гистограмме DECISION_TIME_BUCKETS (линейно внутри корзины)."""
+    total = sum(counts.values())
+    if total <= 0:
+        return None
+    half = total / 2
+    seen = 0
+    for bucket in range(len(DECISION_TIME_BUCKETS) + 1):
+        count = counts.get(bucket, 0)
+        if count <= 0:
+            continue
+        lower = DECISION_TIME_BUCKETS[bucket - 1] if bucket else 0
+        if bucket == len(DECISION_TIME_BUCKETS):
+            return float(lower)
+        if seen + count >= half:
+            return lower + (DECISION_TIME_BUCKETS[bucket] - lower) * (half - seen) / count
+        seen += count
+    return None
+
+
+REBUILD_WHITELIST_SQL = f"""
+DELETE FROM whitelist_current;
+INSERT INTO whitelist_current (id_type, identifier, app_id, status, approved_app_id, arma_id, steam_id)
+SELECT g.id_type, g.k, latest.id, latest.status, g.approved_id,
+       COALESCE(appr.arma_id, latest.arma_id), COALESCE(appr.steam_id, latest.steam_id)
+FROM (
+    SELECT 'arma' AS id_type, arma_id AS k, MAX(id) AS latest_id,
+           MAX(CASE WHEN status = 'approved' THEN id END) AS approved_id
+    FROM applications WHERE arma_id != '' GROUP BY arma_id
+    UNION ALL
+    SELECT 'steam', steam_id, MAX(id), MAX(CASE WHEN status = 'approved' THEN id END)
+    FROM applications WHERE steam_id != '' GROUP BY steam_id
+) AS g
+JOIN applications AS latest ON latest.id = g.latest_id
+LEFT JOIN applications AS appr ON appr.id = g.approved_id;{BUMP_WHITELIST_GENERATION_SQL}
+"""
+
+
+SELECT_WHITELIST_SQL = """
+SELECT id_type, identifier, app_id, status, approved_app_id, arma_id, steam_id
+FROM whitelist_current
+"""
+
+
+def _entry_from_row(row) -> WhitelistEntry:
+    """Преобразование строки whitelist_current в WhitelistEntry."""
+    return WhitelistEntry(
+        id_type=row[0],
+        identifier=_decode_arma(row[1]) if row[0] == "arma" else _decode_steam(row[1]),
+        app_id=row[2],
+        status=row[3],
+        approved_app_id=row[4],
+        arma_id=_decode_arma(row[5]),
+        steam_id=_decode_steam(row[6]),
+    )
+
+
+def load_whitelist_entries(path: str, batch_size: int = 5000) -> Iterator[WhitelistEntry]:
+    """Потоково прочитать whitelist_current через отдельное read-only соединение.
+
+    Синхронная функция для рабочих потоков (asyncio.to_thread): большая выгрузка
+    не занимает event loop и общее соединение Database.
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute(SELECT_WHITELIST_SQL)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield _entry_from_row(row)
+    finally:
+        conn.close()
+
+
+def _canonical_or_legacy(normalize, value: Optional[str], lower: bool = False) -> str:
+    """Каноничная форма значения; некорректные старые значения только обрезаются."""
+    try:
+        return normalize(value or "")
+    except ValueError:
+        text = (value or "").strip()
+        return text.lower() if lower else text
+
+
+def _encode_arma(value: str) -> Any:
+    try:
+        return arma_id_to_bytes(value)
+    except ValueError:
+        return value
+
+
+def _encode_steam(value: str) -> Any:
+    if not value:
+        return None
+    return int(value) if value.isdigit() else value
+
+
+def _decode_arma(value: Any) -> str:
+    if isinstance(value, (bytes, memoryview)):
+        return arma_id_from_bytes(value)
+    return value or ""
+
+
+def _decode_steam(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value)
+
+
 class Database:
-    """Простая обёртка вокруг aiosqlite для управления заявками."""
-    def __init__(self, path: str):
+    """Простая обёртка вокруг aiosqlite для управления заявками.
+
+    identifier_storage задаёт формат хранения arma_id/steam_id: "text" или
+    "compact" (BLOB/INTEGER). Режим хранится в самой базе (bot_state), при
+    отличии запрошенного режима данные конвертируются при connect(). None —
+    использовать режим базы как есть.
+    """
+    def __init__(self, path: str, identifier_storage: Optional[IdentifierStorage] = None):
         self._path = path
         self._conn: Optional[aiosqlite.Connection] = None
+        self._requested_storage = identifier_storage
+        self._compact = False
+
+    async def connect(self, migrate: bool = True) -> None:
+        """Открыть соединение, применить схему и недостающие миграции.
 
-    async def connect(self) -> None:
-        """Открыть соединение и применить схему (без миграций)."""
+        migrate=False — для читателей (API): схема и миграции не трогаются,
+        только проверяется, что база уже приведена ботом к текущей версии.
+        """
         self._conn = await aiosqlite.connect(self._path)
         await self._conn.execute("PRAGMA foreign_keys=ON;")
+        if not migrate:
+            cursor = await self._conn.execute("PRAGMA user_version")
+            version = (await cursor.fetchone())[0]
+            if version < len(self._MIGRATIONS):
+                await self.close()
+                raise RuntimeError(
+                    f"Схема базы {self._path} устарела (версия {version}), запустите бота для миграции"
+                )
+            self._compact = await self.get_state("identifier_storage") == "compact"
+            return
+
         await self._conn.executescript(SCHEMA_SQL)
+        await self._conn.executescript(WHITELIST_SQL)
+        await self._conn.executescript(STATS_SQL)
+        await self._conn.commit()
+        await self._migrate()
+
+        storage = await self.get_state("identifier_storage") or "text"
+        if self._requested_storage and self._requested_storage != storage:
+            await self._convert_identifier_storage(self._requested_storage)
+            storage = self._requested_storage
+        self._compact = storage == "compact"
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def identifier_storage(self) -> IdentifierStorage:
+        return "compact" if self._compact else "text"
+
+    def _enc_arma(self, value: str) -> Any:
+        return _encode_arma(value) if self._compact else value
+
+    def _enc_steam(self, value: str) -> Any:
+        return _encode_steam(value) if self._compact else value
+
+    async def _convert_identifier_storage(self, storage: IdentifierStorage) -> None:
+        """Перекодировать arma_id/steam_id во всех таблицах в нужный формат."""
+        assert self._conn is not None
+        if storage == "compact":
+            arma, steam = _encode_arma, _encode_steam
+        else:
+            arma, steam = _decode_arma, _decode_steam
+        await self._conn.executescript(DROP_WHITELIST_TRIGGERS_SQL)
+        for table in ("applications", "applications_archive"):
+            last_id = 0
+            while True:
+                cursor = await self._conn.execute(
+                    f"SELECT id, arma_id, steam_id FROM {table} WHERE id > ? ORDER BY id LIMIT 5000",
+                    (last_id,),
+                )
+                rows = await cursor.fetchall()
+                if not rows:
+                    break
+                await self._conn.executemany(
+                    f"UPDATE {table} SET arma_id = ?, steam_id = ? WHERE id = ?",
+                    [(arma(_decode_arma(a)), steam(_decode_steam(s)), i) for i, a, s in rows],
+                )
+                last_id = rows[-1][0]
         await self._conn.commit()
+        await self._conn.executescript(WHITELIST_SQL)
+        await self.rebuild_whitelist_current()
+        await self.set_state("identifier_storage", storage)
+
+    async def _migrate(self) -> None:
+        """Применить миграции по PRAGMA user_version. Миграции идемпотентны."""
+        assert self._conn is not None
+        cursor = await self._conn.execute("PRAGMA user_version")
+        version = (await cursor.fetchone())[0]
+        for target, name in enumerate(self._MIGRATIONS, start=1):
+            if version >= target:
+                continue
+            await getattr(self, name)()
+            await self._conn.execute(f"PRAGMA user_version = {target}")
+            await self._conn.commit()
+
+    _MIGRATIONS = (
+        "_migration_incremental_vacuum",
+        "rebuild_whitelist_current",
+        "_migration_canonical_identifiers",
+        "_migration_untyped_identifier_columns",
+        "rebuild_application_stats",
+    )
+
+    async def _migration_incremental_vacuum(self) -> None:
+        """Включить auto_vacuum=INCREMENTAL (требует однократного VACUUM)."""
+        assert self._conn is not None
+        cursor = await self._conn.execute("PRAGMA auto_vacuum")
+        if (await cursor.fetchone())[0] != 2:
+            await self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            await self._conn.commit()
+            await self._conn.execute("VACUUM")
+
+    async def _migration_canonical_identifiers(self) -> None:
+        """Привести сохранённые arma_id/steam_id к каноничной форме и перейти
+        с индексов по выражениям на обычные индексы по колонкам."""
+        assert self._conn is not None
+        await self._conn.executescript(
+            DROP_WHITELIST_TRIGGERS_SQL
+            + """
+            DROP INDEX IF EXISTS idx_applications_arma_key;
+            DROP INDEX IF EXISTS idx_applications_steam_key;
+            """
+        )
+        for table in ("applications", "applications_archive"):
+            last_id = 0
+            while True:
+                cursor = await self._conn.execute(
+                    f"SELECT id, arma_id, steam_id FROM {table} WHERE id > ? ORDER BY id LIMIT 5000",
+                    (last_id,),
+                )
+                rows = await cursor.fetchall()
+                if not rows:
+                    break
+                updates = []
+                for app_id, arma_id, steam_id in rows:
+                    canonical = (_canonical_or_legacy(normalize_arma_id, arma_id, lower=True),
+                                 _canonical_or_legacy(normalize_steam_id, steam_id))
+                    if canonical != (arma_id, steam_id):
+                        updates.append((*canonical, app_id))
+                if updates:
+                    await self._conn.executemany(
+                        f"UPDATE {table} SET arma_id = ?, steam_id = ? WHERE id = ?", updates
+                    )
+                last_id = rows[-1][0]
+            await self._conn.commit()
+        await self._conn.executescript(WHITELIST_SQL)
+        await self.rebuild_whitelist_current()
+
+    async def _migration_untyped_identifier_columns(self) -> None:
+        """Пересоздать таблицы с arma_id/steam_id без TEXT‑affinity, чтобы в них
+        можно было хранить BLOB/INTEGER (режим compact)."""
+        assert self._conn is not None
+        cursor = await self._conn.execute("PRAGMA table_info(applications)")
+        types = {row[1]: row[2].upper() for row in await cursor.fetchall()}
+        if types.get("steam_id") == "BLOB":
+            return
+        cursor = await self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'applications'")
+        row = await cursor.fetchone()
+        seq = row[0] if row else 0
+
+        script = ["BEGIN;", DROP_WHITELIST_TRIGGERS_SQL]
+        for table, columns, suffix in (
+            ("applications", APPLICATIONS_COLUMNS, ""),
+            ("applications_archive", ARCHIVE_COLUMNS, ""),
+            ("whitelist_current", WHITELIST_CURRENT_COLUMNS, " WITHOUT ROWID"),
+        ):
+            script.append(f"""
+            CREATE TABLE {table}__new ({columns}){suffix};
+            INSERT INTO {table}__new SELECT * FROM {table};
+            DROP TABLE {table};
+            ALTER TABLE {table}__new RENAME TO {table};
+            """)
+        script.append(f"UPDATE sqlite_sequence SET seq = MAX(seq, {int(seq)}) WHERE name = 'applications';")
+        script.append("COMMIT;")
+        try:
+            await self._conn.executescript("".join(script))
+        except Exception:
+            await self._conn.rollback()
+            raise
+        await self._conn.executescript(SCHEMA_SQL)
+        await self._conn.executescript(WHITELIST_SQL)
+        await self._conn.executescript(STATS_SQL)
+
+    async def rebuild_whitelist_current(self) -> int:
+        """Пересобрать whitelist_current из истории applications. Возвращает число строк."""
+        assert self._conn is not None
+        try:
+            await self._conn.executescript("BEGIN;" + REBUILD_WHITELIST_SQL + "COMMIT;")
+        except Exception:
+            await self._conn.rollback()
+            raise
+        cursor = await self._conn.execute("SELECT COUNT(*) FROM whitelist_current")
+        return (await cursor.fetchone())[0]
+
+    async def rebuild_application_stats(self) -> None:
+        """Пересчитать счётчики статистики из applications и архива."""
+        assert self._conn is not None
+        try:
+            await self._conn.executescript("BEGIN;" + REBUILD_STATS_SQL + "COMMIT;")
+        except Exception:
+            await self._conn.rollback()
+            raise
+
+    async def get_application_stats(self, days: int = 14) -> ApplicationStats:
+        """Статистика заявок из счётчиков: не зависит от размера applications.
+
+        daily — решения по заявкам в ожидании (день, одобрено, отклонено) за
+        последние days дней; исключения из whitelist сюда не входят.
+        """
+        assert self._conn is not None
+        cursor = await self._conn.execute("SELECT status, platform, count FROM application_stats WHERE count != 0")
+        by_status: Dict[str, int] = {}
+        by_platform: Dict[str, Dict[str, int]] = {}
+        for status, platform, count in await cursor.fetchall():
+            by_status[status] = by_status.get(status, 0) + count
+            by_platform.setdefault(platform, {})[status] = count
+        cursor = await self._conn.execute(
+            "SELECT day, approved, rejected FROM application_daily_stats WHERE day >= date('now', ?) ORDER BY day",
+            (f"-{int(days) - 1} days",),
+        )
+        daily = [tuple(r) for r in await cursor.fetchall()]
+        cursor = await self._conn.execute("SELECT bucket, count FROM decision_time_histogram")
+        histogram = {bucket: count for bucket, count in await cursor.fetchall()}
+        return ApplicationStats(
+            by_status=by_status,
+            by_platform=by_platform,
+            daily=daily,
+            decisions=sum(histogram.values()),
+            median_decision_seconds=_histogram_median(histogram),
+        )
+
+    async def get_whitelist_entry(self, id_type: Literal["arma", "steam"], identifier: str) -> Optional[WhitelistEntry]:
+        """Актуальное состояние whitelist по ArmaID или SteamID (поиск по первичному ключу)."""
+        assert self._conn is not None
+        try:
+            if id_type == "arma":
+                key = self._enc_arma(normalize_arma_id(identifier))
+            else:
+                key = self._enc_steam(normalize_steam_id(identifier))
+        except ValueError:
+            return None
+        if key is None or key == "":
+            return None
+        cursor = await self._conn.execute(
+            SELECT_WHITELIST_SQL + "WHERE id_type = ? AND identifier = ?",
+            (id_type, key),
+        )
+        row = await cursor.fetchone()
+        return _entry_from_row(row) if row else None
+
+    async def get_whitelist_entries_for(self, keys: Iterable[Tuple[str, str]]) -> List[WhitelistEntry]:
+        """Записи whitelist_current для набора (id_type, identifier); отсутствующие пропускаются."""
+        entries = []
+        for id_type, identifier in keys:
+            entry = await self.get_whitelist_entry(id_type, identifier)
+            if entry is not None:
+                entries.append(entry)
+        return entries
 
     async def close(self) -> None:
         """Закрыть соединение, если открыто."""
@@ -68,14 +741,19 @@ class Database:
         platform: str,
         steam_id: str,
     ) -> int:
-        """Создать новую заявку со статусом pending. Возвращает ID заявки."""
+        """Создать новую заявку со статусом pending. Возвращает ID заявки.
+
+        arma_id и steam_id сохраняются в каноничной форме; ValueError, если они некорректны.
+        """
         assert self._conn is not None
+        arma_id = normalize_arma_id(arma_id)
+        steam_id = normalize_steam_id(steam_id)
         cursor = await self._conn.execute(
             """
             INSERT INTO applications (user_id, username, arma_id, platform, steam_id, status)
             VALUES (?, ?, ?, ?, ?, 'pending')
             """,
-            (user_id, username, arma_id, platform, steam_id),
+            (user_id, username, self._enc_arma(arma_id), platform, self._enc_steam(steam_id)),
         )
         await self._conn.commit()
         return cursor.lastrowid
@@ -100,45 +778,35 @@ class Database:
         row = await cursor.fetchone()
         return self._row_to_app(row)
 
-    async def get_steam_id_by_arma_id(self, arma_id: str) -> Optional[str]:
-        """Вернуть steam_id по arma_id, если запись есть."""
+    async def get_user_latest_archived_application(self, user_id: int) -> Optional[Application]:
+        """Последняя архивная заявка пользователя (если живых заявок не осталось)."""
         assert self._conn is not None
         cursor = await self._conn.execute(
-            "SELECT steam_id FROM applications WHERE arma_id = ? LIMIT 1",
-            (arma_id,)
+            "SELECT * FROM applications_archive WHERE user_id = ? ORDER BY id DESC LIMIT 1",
+            (user_id,),
         )
         row = await cursor.fetchone()
-        return row[0] if row and row[0] else None
+        return self._row_to_app(row)
+
+    async def get_steam_id_by_arma_id(self, arma_id: str) -> Optional[str]:
+        """Вернуть steam_id по arma_id, если запись есть."""
+        entry = await self.get_whitelist_entry("arma", arma_id)
+        return entry.steam_id if entry and entry.steam_id else None
 
     async def is_whitelisted_by_arma_id(self, arma_id: str) -> bool:
         """True если есть заявка с arma_id и статусом approved."""
-        assert self._conn is not None
-        cursor = await self._conn.execute(
-            "SELECT 1 FROM applications WHERE arma_id = ? AND status = 'approved' LIMIT 1",
-            (arma_id,)
-        )
-        row = await cursor.fetchone()
-        return bool(row)
+        entry = await self.get_whitelist_entry("arma", arma_id)
+        return bool(entry and entry.whitelisted)
 
     async def get_arma_id_by_steam_id(self, steam_id: str) -> Optional[str]:
         """Вернуть arma_id по steam_id, если запись есть."""
-        assert self._conn is not None
-        cursor = await self._conn.execute(
-            "SELECT arma_id FROM applications WHERE steam_id = ? LIMIT 1",
-            (steam_id,)
-        )
-        row = await cursor.fetchone()
-        return row[0] if row and row[0] else None
+        entry = await self.get_whitelist_entry("steam", steam_id)
+        return entry.arma_id if entry and entry.arma_id else None
 
     async def is_whitelisted_by_steam_id(self, steam_id: str) -> bool:
         """True если есть заявка с steam_id и статусом approved."""
-        assert self._conn is not None
-        cursor = await self._conn.execute(
-            "SELECT 1 FROM applications WHERE steam_id = ? AND status = 'approved' LIMIT 1",
-            (steam_id,)
-        )
-        row = await cursor.fetchone()
-        return bool(row)
+        entry = await self.get_whitelist_entry("steam", steam_id)
+        return bool(entry and entry.whitelisted)
 
     async def update_status(self, app_id: int, status: ApplicationStatus) -> bool:
         """Обновить статус заявки."""
@@ -159,6 +827,11 @@ class Database:
         assert self._conn is not None
         if not fields:
             return True
+        fields = dict(fields)
+        if "arma_id" in fields:
+            fields["arma_id"] = self._enc_arma(normalize_arma_id(fields["arma_id"]))
+        if "steam_id" in fields:
+            fields["steam_id"] = self._enc_steam(normalize_steam_id(fields["steam_id"]))
         columns = ", ".join([f"{k} = ?" for k in fields.keys()])
         values = list(fields.values()) + [app_id]
         cursor = await self._conn.execute(
@@ -188,6 +861,42 @@ class Database:
         await self._conn.commit()
         return cursor.rowcount > 0
 
+    async def bulk_update_status(
+        self,
+        app_ids: Sequence[int],
+        status: ApplicationStatus,
+        comment: Optional[str],
+        admin_id: Optional[int],
+        from_statuses: Sequence[ApplicationStatus],
+    ) -> List[Application]:
+        """Сменить статус сразу у многих заявок одним UPDATE.
+
+        Обновляются только заявки в одном из статусов from_statuses.
+        ID передаются одним JSON‑параметром (json_each), поэтому изменение
+        атомарно при любом числе заявок и не зависит от параллельных вызовов
+        на том же соединении. Возвращает обновлённые заявки.
+        """
+        assert self._conn is not None
+        ids = list(dict.fromkeys(int(i) for i in app_ids))
+        if not ids or not from_statuses:
+            return []
+        status_marks = ", ".join("?" for _ in from_statuses)
+        # RETURNING: все изменения выполняются на первом шаге запроса, строки буферизуются.
+        cursor = await self._conn.execute(
+            f"""
+            UPDATE applications
+            SET status = ?, admin_comment = ?, admin_id = ?, updated_at = datetime('now')
+            WHERE id IN (SELECT value FROM json_each(?)) AND status IN ({status_marks})
+            RETURNING *
+            """,
+            (status, comment, admin_id, json.dumps(ids), *from_statuses),
+        )
+        rows = await cursor.fetchall()
+        await self._conn.commit()
+        updated = [app for app in map(self._row_to_app, rows) if app]
+        updated.sort(key=lambda a: a.id)
+        return updated
+
     async def get_pending_applications(self) -> List[Application]:
         """Вернуть все заявки со статусом 'pending'."""
         assert self._conn is not None
@@ -202,26 +911,299 @@ class Database:
                 apps.append(app)
         return apps
 
+    async def get_pending_page(
+        self,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        limit: int = 10,
+        platform: Optional[str] = None,
+        created_since: Optional[str] = None,
+    ) -> Tuple[List[Application], bool]:
+        """Страница заявок 'pending' с keyset‑пагинацией по id.
+
+        after_id — следующая страница (id > after_id), before_id — предыдущая
+        (id < before_id). Заявки всегда возвращаются по возрастанию id.
+        Второй элемент — есть ли ещё записи в направлении листания.
+        """
+        assert self._conn is not None
+        where = ["status = 'pending'"]
+        params: List[Any] = []
+        if platform:
+            where.append("platform = ?")
+            params.append(platform)
+        if created_since:
+            where.append("created_at >= ?")
+            params.append(created_since)
+
+        backwards = before_id is not None
+        if backwards:
+            where.append("id < ?")
+            params.append(before_id)
+        elif after_id is not None:
+            where.append("id > ?")
+            params.append(after_id)
+
+        order = "DESC" if backwards else "ASC"
+        cursor = await self._conn.execute(
+            f"SELECT * FROM applications WHERE {' AND '.join(where)} ORDER BY id {order} LIMIT ?",
+            (*params, limit + 1),
+        )
+        rows = await cursor.fetchall()
+        has_more = len(rows) > limit
+        apps = [a for a in (self._row_to_app(r) for r in rows[:limit]) if a]
+        if backwards:
+            apps.reverse()
+        return apps, has_more
+
     async def get_application_by_identifier(self, identifier: str) -> Optional[Application]:
         """Вернуть заявку по одному из идентификаторов"""
-        assert self._conn is not None
-        ident = identifier.strip()
+        parsed = parse_identifier(identifier)
+        if parsed is None:
+            return None
+        entry = await self.get_whitelist_entry(*parsed)
+        if entry is None:
+            return None
+        return await self.get_application(entry.app_id)
 
-        l = len(ident)
-        if l == 36:
-            col, params = "arma_id", (ident,)
-        elif l == 17 and ident.isdigit():
-            col, params = "steam_id", (ident,)
-        else:
+    async def get_archived_application_by_identifier(self, identifier: str) -> Optional[Application]:
+        """Вернуть последнюю архивную заявку по ArmaID или SteamID64."""
+        return await self._get_by_identifier("applications_archive", identifier)
+
+    async def _get_by_identifier(self, table: str, identifier: str) -> Optional[Application]:
+        assert self._conn is not None
+        parsed = parse_identifier(identifier)
+        if parsed is None:
             return None
+        if parsed[0] == "arma":
+            col, params = "arma_id", (self._enc_arma(parsed[1]),)
+        else:
+            col, params = "steam_id", (self._enc_steam(parsed[1]),)
 
         cursor = await self._conn.execute(
-            f"SELECT * FROM applications WHERE {col} = ? ORDER BY id DESC LIMIT 1",
+            f"SELECT * FROM {table} WHERE {col} = ? ORDER BY id DESC LIMIT 1",
             params,
         )
         row = await cursor.fetchone()
         return self._row_to_app(row)
 
+    async def archive_applications(
+        self,
+        rejected_older_than_days: int = 30,
+        batch_size: int = 500,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        """Перенести в applications_archive отклонённые заявки, которые
+        вытеснены более новой заявкой того же пользователя или не менялись
+        дольше rejected_older_than_days дней.
+
+        Переносит пачками по batch_size (каждая пачка — своя транзакция),
+        затем возвращает освободившиеся страницы через incremental_vacuum.
+        Возвращает число перенесённых заявок.
+        """
+        assert self._conn is not None
+        columns = "id, user_id, username, arma_id, platform, steam_id, status, created_at, updated_at, admin_comment, admin_id"
+        moved = 0
+        last_id = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            cursor = await self._conn.execute(
+                """
+                SELECT a.id FROM applications a
+                WHERE a.status = 'rejected' AND a.id > ?
+                  AND (
+                    a.updated_at < datetime('now', ?)
+                    OR EXISTS (SELECT 1 FROM applications b WHERE b.user_id = a.user_id AND b.id > a.id)
+                  )
+                ORDER BY a.id
+                LIMIT ?
+                """,
+                (last_id, f"-{int(rejected_older_than_days)} days", batch_size),
+            )
+            ids = [r[0] for r in await cursor.fetchall()]
+            if not ids:
+                break
+            marks = ", ".join("?" for _ in ids)
+            try:
+                await self._conn.execute(
+                    f"INSERT OR REPLACE INTO applications_archive ({columns}) "
+                    f"SELECT {columns} FROM applications WHERE id IN ({marks})",
+                    ids,
+                )
+                await self._conn.execute(f"DELETE FROM applications WHERE id IN ({marks})", ids)
+                await self._conn.execute(f"DELETE FROM admin_messages WHERE app_id IN ({marks})", ids)
+                await self._conn.commit()
+            except Exception:
+                await self._conn.rollback()
+                raise
+            moved += len(ids)
+            last_id = ids[-1]
+            batches += 1
+
+        if moved:
+            # incremental_vacuum освобождает по странице на шаг — дочитываем курсор до конца.
+            cursor = await self._conn.execute("PRAGMA incremental_vacuum")
+            await cursor.fetchall()
+            await self._conn.commit()
+        return moved
+
+    async def get_state(self, key: str) -> Optional[str]:
+        """Прочитать значение из bot_state."""
+        assert self._conn is not None
+        cursor = await self._conn.execute("SELECT value FROM bot_state WHERE key = ?", (key,))
+        row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def set_state(self, key: str, value: str) -> None:
+        """Записать значение в bot_state."""
+        assert self._conn is not None
+        await self._conn.execute(
+            "INSERT INTO bot_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+        await self._conn.commit()
+
+    async def get_admin_message(self, app_id: int) -> Optional[tuple[int, int]]:
+        """Вернуть (channel_id, message_id) карточки заявки в админ‑канале."""
+        assert self._conn is not None
+        cursor = await self._conn.execute(
+            "SELECT channel_id, message_id FROM admin_messages WHERE app_id = ?",
+            (app_id,),
+        )
+        row = await cursor.fetchone()
+        return (row[0], row[1]) if row else None
+
+    async def set_admin_message(self, app_id: int, channel_id: int, message_id: int) -> None:
+        """Запомнить сообщение с карточкой заявки."""
+        assert self._conn is not None
+        await self._conn.execute(
+            "INSERT INTO admin_messages (app_id, channel_id, message_id) VALUES (?, ?, ?) "
+            "ON CONFLICT(app_id) DO UPDATE SET channel_id = excluded.channel_id, message_id = excluded.message_id",
+            (app_id, channel_id, message_id),
+        )
+        await self._conn.commit()
+
+    async def enqueue_notification(self, user_id: int, payload: Dict[str, Any]) -> int:
+        """Поставить ЛС пользователю в очередь отправки. payload — embed.to_dict()."""
+        assert self._conn is not None
+        cursor = await self._conn.execute(
+            "INSERT INTO notifications (user_id, payload) VALUES (?, ?)",
+            (user_id, json.dumps(payload, ensure_ascii=False)),
+        )
+        await self._conn.commit()
+        return cursor.lastrowid
+
+    async def enqueue_notifications(self, items: Iterable[Tuple[int, Dict[str, Any]]]) -> None:
+        """Поставить в очередь несколько ЛС одной транзакцией."""
+        assert self._conn is not None
+        await self._conn.executemany(
+            "INSERT INTO notifications (user_id, payload) VALUES (?, ?)",
+            [(user_id, json.dumps(payload, ensure_ascii=False)) for user_id, payload in items],
+        )
+        await self._conn.commit()
+
+    async def get_due_notifications(self, limit: int = 20) -> List[Notification]:
+        """Уведомления, время отправки которых уже наступило (старые первыми)."""
+        assert self._conn is not None
+        cursor = await self._conn.execute(
+            """
+            SELECT id, user_id, payload, attempts FROM notifications
+            WHERE next_attempt_at <= datetime('now')
+            ORDER BY next_attempt_at, id
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        rows = await cursor.fetchall()
+        return [Notification(id=r[0], user_id=r[1], payload=json.loads(r[2]), attempts=r[3]) for r in rows]
+
+    async def delete_notification(self, notification_id: int) -> None:
+        """Удалить уведомление из очереди (отправлено или отброшено)."""
+        assert self._conn is not None
+        await self._conn.execute("DELETE FROM notifications WHERE id = ?", (notification_id,))
+        await self._conn.commit()
+
+    async def reschedule_notification(self, notification_id: int, delay_seconds: int, error: Optional[str] = None) -> None:
+        """Отложить повторную попытку отправки на delay_seconds."""
+        assert self._conn is not None
+        await self._conn.execute(
+            """
+            UPDATE notifications
+            SET attempts = attempts + 1,
+                next_attempt_at = datetime('now', ?),
+                last_error = ?
+            WHERE id = ?
+            """,
+            (f"+{int(delay_seconds)} seconds", error, notification_id),
+        )
+        await self._conn.commit()
+
+    async def insert_join_attempts(self, rows: Sequence[tuple]) -> None:
+        """Записать пакет проверок (created_at, id_type, identifier, whitelisted, latency_us, remote_addr)."""
+        assert self._conn is not None
+        await self._conn.executemany(INSERT_JOIN_ATTEMPT_SQL, rows)
+        await self._conn.commit()
+
+    async def get_join_attempt_summary(self, since: str, limit: int = 10) -> JoinAttemptSummary:
+        """Сводка проверок начиная с since (UTC, 'YYYY-MM-DD HH:MM:SS'): отказы и частые нарушители."""
+        assert self._conn is not None
+        cursor = await self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(whitelisted = 0), 0) FROM join_attempts WHERE created_at >= ?",
+            (since,),
+        )
+        total, denied = await cursor.fetchone()
+        cursor = await self._conn.execute(
+            """
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM join_attempts
+                WHERE whitelisted = 0 AND created_at >= ?
+                GROUP BY id_type, identifier
+            )
+            """,
+            (since,),
+        )
+        (unique_denied,) = await cursor.fetchone()
+        cursor = await self._conn.execute(
+            """
+            SELECT id_type, identifier, COUNT(*) AS attempts, MAX(created_at)
+            FROM join_attempts
+            WHERE whitelisted = 0 AND created_at >= ?
+            GROUP BY id_type, identifier
+            ORDER BY attempts DESC, MAX(created_at) DESC
+            LIMIT ?
+            """,
+            (since, limit),
+        )
+        offenders = await cursor.fetchall()
+        cursor = await self._conn.execute(
+            """
+            SELECT id_type, identifier, created_at, remote_addr
+            FROM join_attempts
+            WHERE whitelisted = 0 AND created_at >= ?
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+            """,
+            (since, limit),
+        )
+        recent = await cursor.fetchall()
+        return JoinAttemptSummary(
+            total=total,
+            denied=denied,
+            unique_denied=unique_denied,
+            top_denied=[tuple(r) for r in offenders],
+            recent_denied=[tuple(r) for r in recent],
+        )
+
+    async def prune_join_attempts(self, older_than_days: int) -> int:
+        """Удалить записи журнала проверок старше older_than_days дней."""
+        assert self._conn is not None
+        cursor = await self._conn.execute(
+            "DELETE FROM join_attempts WHERE created_at < datetime('now', ?)",
+            (f"-{int(older_than_days)} days",),
+        )
+        await self._conn.commit()
+        return cursor.rowcount
+
     def _row_to_app(self, row) -> Optional[Application]:
         """Преобразование строки БД в dataclass Application."""
         if not row:
@@ -230,9 +1212,9 @@ class Database:
             id=row[0],
             user_id=row[1],
             username=row[2],
-            arma_id=row[3],
+            arma_id=_decode_arma(row[3]),
             platform=row[4],
-            steam_id=row[5],
+            steam_id=_decode_steam(row[5]),
             status=row[6],
             created_at=row[7],
             updated_at=row[8],
@@ -0,0 +1,167 @@
+import asyncio
+import math
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+from src.audit import AuditLog, AuditRow
+from src.db import Database, WhitelistEntry, load_whitelist_entries
+from src.identifiers import normalize_arma_id, normalize_steam_id
+from src.throttle import TokenBucketLimiter
+
+Lookup = Tuple[bool, Optional[str]]
+
+
+def _lookup_value(entry: WhitelistEntry) -> Optional[Lookup]:
+    """Ответ API для записи whitelist_current (None — как будто записи нет)."""
+    if entry.id_type == "arma":
+        return entry.whitelisted, entry.steam_id or None
+    if entry.arma_id:
+        return entry.whitelisted, entry.arma_id
+    return None
+
+
+class DatabaseAuditWriter:
+    """Запись журнала проверок через общее соединение Database бота.
+
+    Вызывается из потока AuditLog и передаёт пакет в event loop бота.
+    """
+
+    def __init__(self, db: Database, loop: asyncio.AbstractEventLoop):
+        self.db = db
+        self.loop = loop
+
+    def __call__(self, rows: Sequence[AuditRow]) -> None:
+        asyncio.run_coroutine_threadsafe(self.db.insert_join_attempts(rows), self.loop).result(timeout=30)
+
+
+class EmbeddedApi:
+    """HTTP API whitelist внутри процесса бота (тот же event loop и та же база).
+
+    Ответы совпадают с src/api.py, но поиск идёт по словарям в памяти:
+    refresh() пересобирает их из whitelist_current, apply() обновляет точечно.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        host: str = "0.0.0.0",
+        port: int = 5000,
+        audit: bool = True,
+        rate_limit: float = 0,
+        rate_burst: int = 1,
+        rate_exempt: Iterable[str] = (),
+    ):
+        self.db = db
+        self.host = host
+        self.port = port
+        self.audit_enabled = audit
+        self.audit: Optional[AuditLog] = None
+        self.limiter = TokenBucketLimiter(rate_limit, rate_burst, exempt=rate_exempt) if rate_limit > 0 else None
+        self._arma: Dict[str, Lookup] = {}
+        self._steam: Dict[str, Lookup] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application(middlewares=[self._throttle])
+        self.app.router.add_get("/api/whitelist/armaId/{arma_id}", self.get_by_arma_id)
+        self.app.router.add_get("/api/whitelist/steamId/{steam_id}", self.get_by_steam_id)
+
+    async def start(self) -> None:
+        """Загрузить whitelist и начать принимать запросы."""
+        await self.refresh()
+        if self.audit_enabled:
+            self.audit = AuditLog(DatabaseAuditWriter(self.db, asyncio.get_running_loop()))
+            self.audit.start()
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"Встроенный API слушает {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self.audit is not None:
+            # Поток журнала пишет через event loop, поэтому ждём его вне loop.
+            await asyncio.to_thread(self.audit.stop)
+            self.audit = None
+
+    async def refresh(self) -> None:
+        """Пересобрать словари поиска из whitelist_current.
+
+        Чтение и сборка идут в рабочем потоке, на event loop словари только
+        подменяются целиком.
+        """
+
+        def _build() -> Tuple[Dict[str, Lookup], Dict[str, Lookup]]:
+            arma: Dict[str, Lookup] = {}
+            steam: Dict[str, Lookup] = {}
+            for entry in load_whitelist_entries(self.db.path):
+                value = _lookup_value(entry)
+                if value is not None:
+                    (arma if entry.id_type == "arma" else steam)[entry.identifier] = value
+            return arma, steam
+
+        self._arma, self._steam = await asyncio.to_thread(_build)
+
+    def apply(self, keys: Iterable[Tuple[str, str]], entries: Iterable[WhitelistEntry]) -> None:
+        """Обновить словари для затронутых ключей (id_type, identifier).
+
+        entries — текущие записи whitelist_current для этих ключей; ключ без
+        записи удаляется.
+        """
+        found = {(e.id_type, e.identifier): e for e in entries}
+        for key in keys:
+            target = self._arma if key[0] == "arma" else self._steam
+            entry = found.get(key)
+            value = _lookup_value(entry) if entry is not None else None
+            if value is None:
+                target.pop(key[1], None)
+            else:
+                target[key[1]] = value
+
+    def lookup_arma(self, aid: str) -> Lookup:
+        return self._arma.get(aid, (False, None))
+
+    def lookup_steam(self, sid: str) -> Lookup:
+        return self._steam.get(sid, (False, None))
+
+    @web.middleware
+    async def _throttle(self, request: web.Request, handler):
+        if self.limiter is not None:
+            wait = self.limiter.acquire(request.remote or "")
+            if wait > 0:
+                return web.json_response(
+                    {"error": "too many requests"}, status=429, headers={"Retry-After": str(math.ceil(wait))}
+                )
+        return await handler(request)
+
+    def _respond(self, request: web.Request, id_type: str, identifier: str, result: Lookup,
+                 linked_key: str, started: float) -> web.Response:
+        whitelisted, linked = result
+        if self.audit is not None:
+            self.audit.record(id_type, identifier, whitelisted, int((time.perf_counter() - started) * 1e6), request.remote)
+        return web.json_response({"whitelisted": whitelisted, linked_key: linked})
+
+    async def get_by_arma_id(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        arma_id = request.match_info["arma_id"]
+        if not arma_id.strip():
+            raise web.HTTPBadRequest()
+        try:
+            aid = normalize_arma_id(arma_id)
+        except ValueError:
+            return self._respond(request, "arma", arma_id.strip(), (False, None), "steamId", started)
+        return self._respond(request, "arma", aid, self.lookup_arma(aid), "steamId", started)
+
+    async def get_by_steam_id(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        steam_id = request.match_info["steam_id"]
+        if not steam_id.strip():
+            raise web.HTTPBadRequest()
+        try:
+            sid = normalize_steam_id(steam_id)
+        except ValueError:
+            return self._respond(request, "steam", steam_id.strip(), (False, None), "armaId", started)
+        return self._respond(request, "steam", sid, self.lookup_steam(sid), "armaId", started)
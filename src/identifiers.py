@@ -0,0 +1,61 @@
+import re
+import uuid
+from typing import Literal, Optional, Tuple
+
+IdType = Literal["arma", "steam"]
+
+# SteamID64 = база индивидуальных аккаунтов + 2 * номер аккаунта + бит Y из STEAM_X:Y:Z.
+STEAM_ID64_BASE = 76561197960265728
+
+_STEAM_ID64_RE = re.compile(r"765\d{14}")
+_STEAM_LEGACY_RE = re.compile(r"STEAM_[0-5]:([01]):(\d+)", flags=re.IGNORECASE)
+
+
+def normalize_arma_id(value: str) -> str:
+    """Каноничный ArmaID: UUID в нижнем регистре с дефисами. ValueError, если это не UUID."""
+    text = (value or "").strip()
+    try:
+        return str(uuid.UUID(text))
+    except ValueError:
+        raise ValueError(f"invalid ArmaID: {value!r}") from None
+
+
+def normalize_steam_id(value: str) -> str:
+    """Каноничный SteamID64 (17 цифр). STEAM_X:Y:Z переводится в SteamID64.
+
+    Пустое значение остаётся пустым (консольные игроки). ValueError для остального.
+    """
+    text = (value or "").strip()
+    if not text:
+        return ""
+    if _STEAM_ID64_RE.fullmatch(text):
+        return text
+    m = _STEAM_LEGACY_RE.fullmatch(text)
+    if m:
+        return str(STEAM_ID64_BASE + int(m.group(2)) * 2 + int(m.group(1)))
+    raise ValueError(f"invalid SteamID64: {value!r}")
+
+
+def parse_identifier(value: str) -> Optional[Tuple[IdType, str]]:
+    """Определить тип идентификатора и вернуть (тип, каноничное значение) или None."""
+    text = (value or "").strip()
+    if not text:
+        return None
+    try:
+        return "steam", normalize_steam_id(text)
+    except ValueError:
+        pass
+    try:
+        return "arma", normalize_arma_id(text)
+    except ValueError:
+        return None
+
+
+def arma_id_to_bytes(value: str) -> bytes:
+    """Каноничный ArmaID -> 16 байт."""
+    return uuid.UUID(value).bytes
+
+
+def arma_id_from_bytes(value: bytes) -> str:
+    """16 байт -> каноничный ArmaID."""
+    return str(uuid.UUID(bytes=bytes(value)))
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import Optional, Set
+
+import discord
+
+from src.db import Database, Notification
+
+
+class NotificationWorker:
+    """Фоновая отправка личных сообщений из очереди notifications.
+
+    Сообщения отправляются не чаще одного раза в min_interval секунд; при ошибке
+    попытка откладывается с экспоненциальной задержкой. Если пользователь закрыл
+    ЛС или не найден — уведомление отбрасывается. Если после отправки не удалось
+    удалить уведомление из очереди, повторяется только удаление, без повторной
+    отправки.
+    """
+
+    def __init__(
+        self,
+        client: discord.Client,
+        db: Database,
+        min_interval: float = 1.0,
+        base_delay: int = 30,
+        max_delay: int = 3600,
+        max_attempts: int = 8,
+        batch_size: int = 20,
+        idle_poll: float = 30.0,
+    ):
+        self.client = client
+        self.db = db
+        self.min_interval = min_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.idle_poll = idle_poll
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_sent = 0.0
+        # Уже отправленные уведомления, которые не удалось удалить из очереди.
+        self._delivered: Set[int] = set()
+
+    def start(self) -> None:
+        """Запустить воркер в текущем event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="notification-worker")
+
+    async def stop(self) -> None:
+        """Остановить воркер."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self) -> None:
+        """Сообщить воркеру, что в очереди появились уведомления."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        await self.client.wait_until_ready()
+        while True:
+            try:
+                due = await self.db.get_due_notifications(self.batch_size)
+            except Exception as e:
+                print(f"Ошибка чтения очереди уведомлений: {e}")
+                due = []
+
+            if not due:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.idle_poll)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for notification in due:
+                if notification.id not in self._delivered:
+                    await self._throttle()
+                try:
+                    await self._deliver(notification)
+                except Exception as e:
+                    # Ошибка базы не должна останавливать воркер: уведомление
+                    # останется в очереди и будет взято при следующем проходе.
+                    print(f"Ошибка обработки уведомления {notification.id}: {e}")
+
+    async def _throttle(self) -> None:
+        delay = self._last_sent + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._last_sent = time.monotonic()
+
+    async def _resolve_user(self, user_id: int) -> Optional[discord.abc.User]:
+        user = self.client.get_user(user_id)
+        if user is not None:
+            return user
+        return await self.client.fetch_user(user_id)
+
+    async def _deliver(self, notification: Notification) -> None:
+        if notification.id not in self._delivered:
+            if not await self._send(notification):
+                return
+            self._delivered.add(notification.id)
+        await self.db.delete_notification(notification.id)
+        self._delivered.discard(notification.id)
+
+    async def _send(self, notification: Notification) -> bool:
+        """Отправить ЛС. При ошибке уведомление отбрасывается или откладывается, результат — False."""
+        try:
+            user = await self._resolve_user(notification.user_id)
+            await user.send(embed=discord.Embed.from_dict(notification.payload))
+        except (discord.Forbidden, discord.NotFound) as e:
+            print(f"Уведомление {notification.id} для {notification.user_id} отброшено: {e}")
+            await self.db.delete_notification(notification.id)
+            return False
+        except Exception as e:
+            attempts = notification.attempts + 1
+            if attempts >= self.max_attempts:
+                print(f"Уведомление {notification.id} отброшено после {attempts} попыток: {e}")
+                await self.db.delete_notification(notification.id)
+            else:
+                delay = min(self.base_delay * 2 ** notification.attempts, self.max_delay)
+                await self.db.reschedule_notification(notification.id, delay, str(e)[:500])
+            return False
+        return True
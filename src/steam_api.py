@@ -1,10 +1,23 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
+
+def api_base() -> str:
+    """Базовый адрес Steam Web API (STEAM_API_BASE — для тестов и прокси)."""
+    return os.getenv("STEAM_API_BASE", "https://api.steampowered.com").rstrip("/")
+
+
 def check_profile_open(api_key: str, steam_id: str) -> dict:
-    """Проверяет открыт ли профиль Steam (публичный, есть часы, есть недавние игры)"""
-    U = "https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2/"
-    O = "https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
-    R = "https://api.steampowered.com/IPlayerService/GetRecentlyPlayedGames/v1/"
+    """Проверяет открыт ли профиль Steam (публичный, есть часы, есть недавние игры).
+
+    Три запроса к Steam выполняются параллельно.
+    """
+    base = api_base()
+    U = f"{base}/ISteamUser/GetPlayerSummaries/v2/"
+    O = f"{base}/IPlayerService/GetOwnedGames/v1/"
+    R = f"{base}/IPlayerService/GetRecentlyPlayedGames/v1/"
 
     def j(url, params):
         try:
@@ -15,14 +28,19 @@ def check_profile_open(api_key: str, steam_id: str) -> dict:
 
     out = {'profile_public': False, 'has_games_with_playtime': False, 'has_recent_games': False, 'open': False, 'error': None}
 
-    p = (j(U, {"key": api_key, "steamids": steam_id}).get("response", {}).get("players", []) or [{}])[0]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        fu = pool.submit(j, U, {"key": api_key, "steamids": steam_id})
+        fo = pool.submit(j, O, {"key": api_key, "steamid": steam_id, "include_appinfo": 1})
+        fr = pool.submit(j, R, {"key": api_key, "steamid": steam_id})
+
+    p = (fu.result().get("response", {}).get("players", []) or [{}])[0]
     out['profile_public'] = p.get('communityvisibilitystate') == 3 and p.get('profilestate') == 1
 
-    g = j(O, {"key": api_key, "steamid": steam_id, "include_appinfo": 1}).get("response", {})
+    g = fo.result().get("response", {})
     gh = sum(x.get('playtime_forever', 0) for x in g.get('games', []))
     out['has_games_with_playtime'] = bool(g.get('game_count') and gh > 0)
 
-    r = j(R, {"key": api_key, "steamid": steam_id}).get("response", {})
+    r = fr.result().get("response", {})
     out['has_recent_games'] = bool(r.get('total_count', 0) > 0)
 
     out['open'] = out['profile_public'] and out['has_games_with_playtime'] and out['has_recent_games']
@@ -33,7 +51,7 @@ def get_arma_games(api_key, steam_id, playtime: bool = False):
     """Возвращает игры ARMA/SQUAD/DayZ с ненулевым временем.
     playtime=True -> (name, hours), иначе -> name.
     """
-    url = "https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
+    url = f"{api_base()}/IPlayerService/GetOwnedGames/v1/"
     params = {
         'key': api_key,
         'steamid': steam_id,
@@ -0,0 +1,41 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Tuple
+
+
+class TokenBucketLimiter:
+    """Ограничение частоты запросов по клиенту (token bucket).
+
+    Каждому клиенту доступно burst запросов сразу и rate запросов в секунду
+    дальше. Хранится не больше max_clients корзин (давно неактивные
+    вытесняются — для них это равносильно полной корзине). Клиенты из
+    exempt не ограничиваются.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10_000, exempt: Iterable[str] = ()):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.exempt = frozenset(exempt)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client: str) -> float:
+        """Списать токен. 0 — запрос разрешён, иначе через сколько секунд повторить."""
+        if client in self.exempt:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            if tokens >= 1.0:
+                self._buckets[client] = (tokens - 1.0, now)
+                wait = 0.0
+            else:
+                self._buckets[client] = (tokens, now)
+                wait = (1.0 - tokens) / self.rate
+            self._buckets.move_to_end(client)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
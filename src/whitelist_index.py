@@ -0,0 +1,206 @@
+import asyncio
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from src.db import Database, WhitelistEntry, load_whitelist_entries
+from src.identifiers import arma_id_from_bytes, arma_id_to_bytes, normalize_arma_id, normalize_steam_id
+
+# Формат файла (все числа big-endian, чтобы ключи сравнивались побайтово):
+#   заголовок: magic, версия, резерв, поколение, число записей arma, число записей steam;
+#   секция arma:  UUID (16 байт) | связанный SteamID64 (8 байт, 0 — нет) | флаги (1 байт);
+#   секция steam: SteamID64 (8 байт) | связанный UUID (16 байт, нули — нет) | флаги (1 байт).
+# Обе секции отсортированы по ключу. Флаг 1 — игрок в whitelist.
+MAGIC = b"AWLI"
+VERSION = 1
+HEADER = struct.Struct(">4sHHQQQ")
+ARMA_RECORD = struct.Struct(">16sQB")
+STEAM_RECORD = struct.Struct(">Q16sB")
+FLAG_WHITELISTED = 1
+
+_NO_ARMA = bytes(16)
+
+Lookup = Tuple[bool, Optional[str]]
+
+
+def _arma_key(value: str) -> Optional[bytes]:
+    try:
+        return arma_id_to_bytes(normalize_arma_id(value))
+    except ValueError:
+        return None
+
+
+def _steam_key(value: str) -> Optional[int]:
+    try:
+        steam_id = normalize_steam_id(value)
+    except ValueError:
+        return None
+    return int(steam_id) if steam_id else None
+
+
+def build_index(entries: Iterable[WhitelistEntry], generation: int) -> bytes:
+    """Собрать содержимое файла индекса из записей whitelist_current.
+
+    Записи с идентификаторами, которые нельзя привести к каноничной форме,
+    пропускаются: API всё равно не может их запросить.
+    """
+    arma: List[Tuple[bytes, int, int]] = []
+    steam: List[Tuple[int, bytes, int]] = []
+    for entry in entries:
+        flags = FLAG_WHITELISTED if entry.whitelisted else 0
+        if entry.id_type == "arma":
+            key = _arma_key(entry.identifier)
+            if key is not None:
+                arma.append((key, _steam_key(entry.steam_id) or 0, flags))
+        else:
+            key = _steam_key(entry.identifier)
+            if key is not None:
+                steam.append((key, _arma_key(entry.arma_id) or _NO_ARMA, flags))
+    arma.sort()
+    steam.sort()
+
+    parts = [HEADER.pack(MAGIC, VERSION, 0, generation, len(arma), len(steam))]
+    parts.extend(ARMA_RECORD.pack(*rec) for rec in arma)
+    parts.extend(STEAM_RECORD.pack(*rec) for rec in steam)
+    return b"".join(parts)
+
+
+def write_index_file(path: str, data: bytes) -> None:
+    """Атомарно заменить файл индекса (временный файл + os.replace)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".whitelist-index-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+async def export_whitelist_index(db: Database, path: str) -> int:
+    """Выгрузить whitelist_current в файл индекса. Возвращает размер файла в байтах.
+
+    Чтение, упаковка и запись идут в рабочем потоке через отдельное соединение
+    с базой (load_whitelist_entries), event loop бота только ждёт результат.
+    """
+
+    def _write() -> int:
+        data = build_index(load_whitelist_entries(db.path), time.time_ns())
+        write_index_file(path, data)
+        return len(data)
+
+    return await asyncio.to_thread(_write)
+
+
+class _Mapping:
+    """Отображённый в память файл индекса одного поколения."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        magic, version, _, self.generation, self.arma_count, self.steam_count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"unsupported whitelist index: {path}")
+        expected = HEADER.size + self.arma_count * ARMA_RECORD.size + self.steam_count * STEAM_RECORD.size
+        if len(self.mm) != expected:
+            raise ValueError(f"truncated whitelist index: {path}")
+        self.steam_base = HEADER.size + self.arma_count * ARMA_RECORD.size
+
+    def find(self, base: int, count: int, size: int, key: bytes) -> Optional[int]:
+        """Бинарный поиск по отсортированной секции; смещение записи или None."""
+        mm, klen = self.mm, len(key)
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            off = base + mid * size
+            probe = mm[off:off + klen]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return off
+        return None
+
+
+class WhitelistIndex:
+    """Читатель файла индекса whitelist через mmap.
+
+    Файл общий для всех воркеров API (страницы лежат в page cache ОС). Замена
+    файла обнаруживается по stat() не чаще раза в check_interval секунд.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._mapping: Optional[_Mapping] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> Optional[int]:
+        mapping = self._current()
+        return mapping.generation if mapping else None
+
+    def _current(self) -> Optional[_Mapping]:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._mapping
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._mapping
+            self._checked_at = now
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._mapping = None
+                return None
+            mapping = self._mapping
+            if mapping is None or mapping.key != (st.st_ino, st.st_mtime_ns, st.st_size):
+                try:
+                    # Старое отображение закроется сборщиком мусора, когда его
+                    # перестанут использовать потоки, начавшие поиск раньше.
+                    self._mapping = _Mapping(self.path)
+                except (OSError, ValueError) as e:
+                    print(f"Не удалось загрузить индекс whitelist {self.path}: {e}")
+            return self._mapping
+
+    @property
+    def available(self) -> bool:
+        return self._current() is not None
+
+    def lookup_arma(self, arma_id: str) -> Optional[Lookup]:
+        """(в whitelist, связанный SteamID) для каноничного ArmaID или None, если записи нет."""
+        mapping = self._current()
+        if mapping is None:
+            return None
+        off = mapping.find(HEADER.size, mapping.arma_count, ARMA_RECORD.size, arma_id_to_bytes(arma_id))
+        if off is None:
+            return None
+        _, steam_id, flags = ARMA_RECORD.unpack_from(mapping.mm, off)
+        return bool(flags & FLAG_WHITELISTED), str(steam_id) if steam_id else None
+
+    def lookup_steam(self, steam_id: str) -> Optional[Lookup]:
+        """(в whitelist, связанный ArmaID) для каноничного SteamID64 или None, если записи нет."""
+        mapping = self._current()
+        if mapping is None:
+            return None
+        key = int(steam_id).to_bytes(8, "big")
+        off = mapping.find(mapping.steam_base, mapping.steam_count, STEAM_RECORD.size, key)
+        if off is None:
+            return None
+        _, arma_id, flags = STEAM_RECORD.unpack_from(mapping.mm, off)
+        return bool(flags & FLAG_WHITELISTED), arma_id_from_bytes(arma_id) if arma_id != _NO_ARMA else None